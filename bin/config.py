@@ -17,14 +17,34 @@
 # Python edgegrid module - CONFIG for EAA CLI module
 
 import os
+import re
+import sys
+import stat
 import argparse
 import time
-
-from configparser import ConfigParser
+from functools import lru_cache
 
 import _paths
 from error import rc_error, cli_exit_with_error
 
+#: Default location of the credentials file, expanded once
+_HOME_EDGERC = os.path.expanduser("~/.edgerc")
+_DEFAULT_EDGERC = os.path.expanduser(os.environ.get('AKAMAI_EDGERC', _HOME_EDGERC))
+
+#: Accepted values of the positional choices
+_LOG_TYPES = ('access', 'admin')
+_DP_COMMANDS = ('inventory', )
+
+#: Commands run without reading .edgerc, None is when no command is given (help)
+_OFFLINE_COMMANDS = (None, 'version')
+
+#: .edgerc syntax, same delimiters as ConfigParser
+_EDGERC_SECTION = re.compile(r'\[(?P<name>.+)\]')
+_EDGERC_OPTION = re.compile(r'(?P<key>[^=:\s][^=:]*?)\s*[=:]\s*(?P<value>.*)')
+#: %(name)s reference in a value, and how deep references may be nested, like ConfigParser
+_EDGERC_REFERENCE = re.compile(r'%\(([^)]+)\)s')
+_EDGERC_MAX_DEPTH = 10
+
 
 def strtobool(value):
     """
@@ -44,265 +64,447 @@ def strtobool(value):
         raise ValueError("invalid input value %r" % (value,))
 
 
-class EdgeGridConfig():
+def _readable_file(path):
+    """
+    argparse type for file arguments only read by the command handler.
+    Check the path now, the file is opened when it is actually needed.
+    """
+    if not os.path.isfile(path) or not os.access(path, os.R_OK):
+        raise argparse.ArgumentTypeError("can't open '%s'" % path)
+    return path
 
-    parser = argparse.ArgumentParser(prog="akamai eaa",
-                                     description='Enterprise Application Access (EAA) for Akamai CLI')
 
-    def __init__(self, config_values, configuration, flags=None):
-        parser = self.parser
-
-        subparsers = parser.add_subparsers(dest='command', help='Main command')
-
-        event_parser = subparsers.add_parser("log", aliases=["l"], help="Fetch log events")
-        event_parser.add_argument('log_type', nargs='?', default="access",
-                                  choices=['access', 'admin'], help="Log line type")
-        event_parser.add_argument('--start', '-s', type=int, help="Start datetime (EPOCH)")
-        event_parser.add_argument('--end', '-e', type=int, help="End datetime (EPOCH)")
-        event_parser.add_argument('--output', '-o', help="Output file, default is stdout. Encoding is utf-8.")
-        event_parser.add_argument('--json', '-j', action="store_true", default=False,
-                                  help="Output as JSON instead of raw line")
-        event_parser.add_argument('--limit', type=int, default=5000,
-                                  help="Size of logs to fetch in one API call. Max supported 5000")
-        event_parser.add_argument('--delay', type=int, default=600,
-                                  help="Log delay is seconds, minimum is 600s")
-        event_parser.add_argument('--tail', '-f', action='store_true', default=False,
-                                  help="""Do not stop when most recent log is reached,
-                                  but rather to wait for additional data to be appended to the input.""")
-
-        search_parser = subparsers.add_parser('search', aliases=["s"], help='Search in EAA Application configurations')
-        search_parser.add_argument('pattern', nargs='?')
-
-        dir_parser = subparsers.add_parser('dir', aliases=['d'], help='Manage EAA directories')
-        dir_parser.add_argument('directory_id', help="EAA Directory ID (e.g. dir://abcdefghi)", nargs='?')
-        subsub = dir_parser.add_subparsers(dest="action", help='Directory action (default is: list)')
-#        subsub.add_parser("list", help="List EAA directories")
+def _positive_int(value):
+    "argparse type for counts that must be at least 1, e.g. --concurrency."
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid int value: '%s'" % value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be at least 1, got %s" % number)
+    return number
 
-        listgrp_parser = subsub.add_parser("list", help="List all groups existing in an EAA directory")
-        listgrp_parser.add_argument('--groups', '-g', action='store_true', default=True, help="Display users")
-        listgrp_parser.add_argument('--users', '-u', action='store_true', default=False, help="Display groups")
-        listgrp_parser.add_argument('--json', action='store_true', default=False, help="Output as JSON")
-        listgrp_parser.add_argument('--tail', '-f', action='store_true', default=False,
-                                    help="Keep watching directory list, do not exit until Control+C/SIGTERM")
-        listgrp_parser.add_argument('search_pattern', nargs='?', help="Search pattern")
-
-        addgrp_parser = subsub.add_parser("addgroup", help="Add Group")
-        addgrp_parser.add_argument(
-            'dn',
-            help="Distinguished Name (when existing "
-                 "group in directory as string or @file "
-                 "for multiple DNs, eg. \"CN=Support,"
-                 "CN=Users,DC=CONTOSO,DC=NET\"")
-
-        addovlgrp_parser = subsub.add_parser(
-            "addovlgroup",
-            help="Add Overlay Group")
-        addovlgrp_parser.add_argument('group', help="Group Name")
-
-        subsub.add_parser("sync", help="Synchronize directory")
-        syncgrp_parser = subsub.add_parser("syncgroup", help="Synchronize group")
-        syncgrp_parser.add_argument('group_uuid', help="Group UUID e.g. group://abcedf")
-        # mininterval | Undocumented argument
-        # Group synchronization will be ignored if the last request
-        # was performed before this amount of time in second. Use 0
-        # to force the synchronization. Default is 1800 seconds (30 minutes)
-        syncgrp_parser.add_argument('--mininterval', '-i', type=int, default=1800, help=argparse.SUPPRESS)
-        # retry | Undocumented argument
-        # Number of retry allowed if the sync command fails. Default: 0
-        syncgrp_parser.add_argument("--retry", "-r", type=int, default=0, help=argparse.SUPPRESS)
-        # New: akamai eaa app xyz add_dnsexception www.abcd.efg
-        #      akamai eaa app xyz del_dnsexception www.abcd.efg
-        
-        app_parser = subparsers.add_parser('app', aliases=["a"], help='Manage EAA applications')
-        app_parser.add_argument(dest='application_id', help="Application ID, AppGroup ID or '-'")
-        subsub = app_parser.add_subparsers(dest="action", help='Application action')
-        # DNS exception add/remove
-        adddns_parser = subsub.add_parser("add_dnsexception", help="Add DNS Exception to tunnel-type client-app")
-        adddns_parser.add_argument(dest="exception_fqdn", metavar='fqdn', nargs="+", help='DNS exception FQDN')
-        deldns_parser = subsub.add_parser("del_dnsexception", help="Remove DNS Exception from tunnel-type client-app")
-        deldns_parser.add_argument(dest="exception_fqdn",  metavar='fqdn', nargs="+", help='DNS exception FQDN')
-        # Connector attach/detach
-        attcon_parser = subsub.add_parser("attach", help="Attach an EAA Connector to the application")
-        attcon_parser.add_argument(dest="connector_id", nargs="+",
-                                   help='Attach one or multiple connectors to the application e.g. con://123456')
-        detcon_parser = subsub.add_parser("detach", help="Detach EAA Connector to the application")
-        detcon_parser.add_argument(dest="connector_id", nargs="+",
-                                   help='Detach one or multiple connectors to the application, e.g. con://123456.')
-
-        deploy_parser = subsub.add_parser("deploy", help="Deploy the application")
-        deploy_parser.add_argument("--comment", "-c", nargs="?", default="Deploy from cli-eaa",
-                                   help="Comment for the deployment")
-        update_parser = subsub.add_parser("update", help="Update an existing application")
-        update_parser.add_argument('--var', dest="variables", action='append', nargs='+', default=[])
-        create_parser = subsub.add_parser("create", help="Create a new application")
-        create_parser.add_argument('--var', dest="variables", default=[], action='append', nargs='+')
-        subsub.add_parser("delete", help="Delete an application")
-        subsub.add_parser("view", help="Dump application configuration (JSON)")
-        subsub.add_parser("viewgroups", help="View groups associated to application")
-        subsub.add_parser("delgroup", help="Remove group from application, appgroup ID must provided")
-        addgrp_parser = subsub.add_parser("addgroup", help="Add group(s) to application, app ID and appgroup ID must provided")
-        addgrp_parser.add_argument(dest="appgrp_id", nargs="+",
-                                   help='Add group(s) to application')
-
-        cert_parser = subparsers.add_parser('certificate', aliases=["cert"], help='Manage EAA Certificates')
-        cert_parser.add_argument(dest='certificate_id', nargs="?", default=None,
-                                 help="Certificate ID (e.g. crt://abcdefghi)")
-        subsub = cert_parser.add_subparsers(dest="action", help='Certificate operation')
-        subsub.add_parser("list", help="List certificates")
-        subsub.add_parser("delete", help="Delete existing certificate")
-        subsub.add_parser("status", help="Display status of application/idp using the certificate")
-        certadd_parser = subsub.add_parser("rotate", help="Rotate existing certificate with a new one")
-        certadd_parser.add_argument('--cert', '-c', required=True, type=argparse.FileType('r'),
-                                    help="Certificate in PEM format")
-        certadd_parser.add_argument('--key', '-k', required=True, type=argparse.FileType('r'), help="Private Key")
-        certadd_parser.add_argument('--passphrase', '--pass', '-p', help="Certificate passphrase")
-        certadd_parser.add_argument('--deployafter', '--deploy', '-d', action="store_true", default=False,
-                                    help="Deploy impacted apps/idp after the rotation")
-
-        report_parser = subparsers.add_parser('report', aliases=["r"], help='EAA reports')
-        # Pre 0.6.9
-        # report_parser.add_argument(dest='report_name', choices=['clients', 'last_access'], help="Report name")
-        subsub = report_parser.add_subparsers(dest="report_name", help='Report name')
-        subsub.add_parser("clients")
-        access_parser = subsub.add_parser("last_access")
-        access_parser.add_argument('--app', '-a', type=str, help="Application/IdP UUID")
-        access_parser.add_argument('--start', '-s', type=int, default=int(time.time() - 7 * 24 * 60 * 60),
-                                   help="Start datetime (EPOCH), default is 1 week ago")
-        access_parser.add_argument('--end', '-e', type=int, default=int(time.time()), 
-                                   help="End datetime (EPOCH), default is now")
-
-        con_parser = subparsers.add_parser('connector', aliases=["c", "con"], help='Manage EAA connectors')
-        con_parser.add_argument(dest='connector_id', nargs="?", default=None,
-                                help="Connector ID (e.g. con://abcdefghi)")
-        subsub = con_parser.add_subparsers(dest="action", help="Connector operation")
-        app_parser = subsub.add_parser("apps", help="List applications used by the connector")
-        app_parser.add_argument('--perf', default=False, action="store_true", help='Show performance metrics')
-
-        list_parser = subsub.add_parser("list", help="List all connectors")
-        list_parser.add_argument('--perf', default=False, action="store_true", help='Show performance metrics')
-        list_parser.add_argument('--json', '-j', default=False, action="store_true", help='View as JSON')
-        list_parser.add_argument('--showapps', '-a', default=False, action="store_true",
-                                 help='Response contains the applications running on the connector (JSON only)')
-        list_parser.add_argument('--tail', '-f', default=False, action="store_true",
-                                 help='Keep watching, do not exit until Control+C/SIGTERM')
-        list_parser.add_argument('--interval', '-i', default=300, type=float,
-                                 help='Interval between update (works with --tail only)')
-        # subparsers.required = False
-        swap_parser = subsub.add_parser("swap", help="Swap connector with another one")
-        swap_parser.add_argument(dest="new_connector_id", help='New connector ID')
-        swap_parser.add_argument('--dryrun', dest="dryrun", action="store_true", default=False, help='Dry run mode')
-        
-        remove_parser = subsub.add_parser("remove", aliases=["rm"], help="Unregister a connector")
-        remove_parser.add_argument('--force', dest="force", action="store_true", default=False, help='Forcibly remove the connector from apps')
-
-        create_parser = subsub.add_parser("create", help="Create a new EAA connector")
-        create_parser.add_argument('--name', dest="connector_name", help='Name of the connector')
-        create_parser.add_argument('--description', dest="connector_description", help='Description of the connector')
-        create_parser.add_argument('--package', dest="connector_package", help='Package of the connector')
-        create_parser.add_argument('--debug', dest="connector_debug", default=False, action="store_true", help='Debug mode')
-        create_parser.add_argument('--wait', dest="connector_dl_wait", type=int, default=0, 
-                                   help='''Max wait in seconds for the download URL to be available. 
-                                           If set to 0, will provide the connector info immediately after creation''')
-
-        allowlist_parser = subsub.add_parser("allowlist", 
-            help="Dump EAA Cloud Endpoint for Firewall/Proxy/Network Security equipement")
-        allowlist_parser.add_argument('--skip-header', dest="skip_header", action="store_true", default=False, 
-            help='Do not print CSV header (first row)')
-        allowlist_parser.add_argument('--used', dest="only_used", action="store_true", default=False, 
-            help='Show only endpoints being used by your EAA configurations')
-        allowlist_parser.add_argument('--fqdn', dest="fqdn", action="store_true", default=False, 
-            help='Show Hostname instead of IP/CIDR')
-        allowlist_parser.add_argument('--since-time', dest="since_time", default=None, 
-            help='Only print endpoints updated after a specific date (RFC3339)')
-
-        subparsers.add_parser('idp', aliases=["i"], help='Manage EAA Identity Providers')
-
-        info_parser = subparsers.add_parser('info', help='Display tenant info (cloud zone)')
-        info_parser.add_argument("--show-usage", dest="show_usage", action="store_true", default=False, 
-                                 help="Show configuration count using each cloud zone")
-
-        dp_parser = subparsers.add_parser('dp', help='Device Posture')
-        dp_parser.add_argument("dpcommand", choices=['inventory'], default="inventory")
-        dp_parser.add_argument("--tail", "-f", default=False, action="store_true",
-                               help="Keep pulling the inventory every interval seconds")
-        dp_parser.add_argument("--interval", "-i", type=int, default=600,
-                               help="Pulling interval in seconds (default: 600)")
-        # Placeholder future json vs. flat output
-        dp_parser.add_argument("--json", "-j", action="store_true", default=True, help=argparse.SUPPRESS)
 
-#        dpdh = subparsers.add_parser('dp_devhist', help='Device Posture Device History (experimental)')
-#        $dpdh.add_argument("device_id")
+@lru_cache(maxsize=4)
+def _load_edgerc(path, mtime_ns, size):
+    """
+    Parse the .edgerc credentials file into {section: {key: value}}.
+    .edgerc is a plain INI file without multi-line values, two regular expressions do
+    the job of ConfigParser at a fraction of the cost. Like ConfigParser, keys are
+    lowercased and the DEFAULT section values apply to every section. Values are
+    returned raw, see _interpolate().
+    Modification time and size are part of the cache key so an updated file is read again,
+    even when it is rewritten within the filesystem timestamp granularity.
+    """
+    sections = {}
+    options = None
+    with open(path, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] in '#;':
+            continue
+        section = _EDGERC_SECTION.match(line)
+        if section:
+            options = sections.setdefault(section.group('name'), {})
+            continue
+        option = _EDGERC_OPTION.match(line)
+        if option and options is not None:
+            options[option.group('key').lower()] = option.group('value')
+    defaults = sections.pop('DEFAULT', {})
+    return {name: {**defaults, **section_options} for name, section_options in sections.items()}
+
+
+def _interpolate(value, options, depth=1):
+    """
+    Expand a .edgerc value the way ConfigParser (BasicInterpolation) does when
+    reading it: '%%' is a literal '%', '%(key)s' is the value of another key of
+    the section or of DEFAULT, any other '%' is an error.
+    Raise ValueError where ConfigParser raises an InterpolationError.
+    """
+    if '%' not in value:
+        return value
+    if depth > _EDGERC_MAX_DEPTH:
+        raise ValueError("references nested more than %s levels deep" % _EDGERC_MAX_DEPTH)
+    expanded = []
+    rest = value
+    while rest:
+        position = rest.find('%')
+        if position < 0:
+            expanded.append(rest)
+            break
+        expanded.append(rest[:position])
+        rest = rest[position:]
+        following = rest[1:2]
+        if following == '%':
+            expanded.append('%')
+            rest = rest[2:]
+        elif following == '(':
+            reference = _EDGERC_REFERENCE.match(rest)
+            if reference is None:
+                raise ValueError("bad interpolation variable reference %r" % rest)
+            key = reference.group(1).lower()
+            if key not in options:
+                raise ValueError("bad interpolation variable reference %r, no option %r" % (rest, key))
+            expanded.append(_interpolate(options[key], options, depth + 1))
+            rest = rest[reference.end():]
+        else:
+            raise ValueError("'%%' must be followed by '%%' or '(', found: %r" % rest)
+    return ''.join(expanded)
 
-        subparsers.add_parser('version', help='Display cli-eaa module version')
 
+def _add_global_arguments(parser):
+    "Add the global options to parser, return their argparse actions."
+    return [
         parser.add_argument('--batch', '-b', default=False, action='store_true',
-                            help='Batch mode, remove the extra header/footer in lists.')
-        parser.add_argument('--debug', '-d', action="store_true", default=strtobool(os.environ.get("CLIEAA_DEBUG", False)),
-                            help=' Debug mode (log HTTP headers)')
+                            help='Batch mode, remove the extra header/footer in lists.'),
+        parser.add_argument('--debug', '-d', action="store_true",
+                            default=strtobool(os.environ.get("CLIEAA_DEBUG", False)),
+                            help=' Debug mode (log HTTP headers)'),
         parser.add_argument('--edgerc', '-e',
-                            default=os.environ.get('AKAMAI_EDGERC', '~/.edgerc'),
+                            default=_DEFAULT_EDGERC,
                             metavar='credentials_file',
-                            help=' Credentials file, [$AKAMAI_EDGERC], then %s)' %
-                            os.path.expanduser("~/.edgerc"))
+                            help=' Credentials file, [$AKAMAI_EDGERC], then %s)' % _HOME_EDGERC),
         parser.add_argument('--proxy', '-p', default='', help=''' HTTP/S Proxy Host/IP and port number,
-                                                                  do not use prefix (e.g. 10.0.0.1:8888)''')
+                                                                  do not use prefix (e.g. 10.0.0.1:8888)'''),
         parser.add_argument('--section', '-c', default=os.environ.get('AKAMAI_EDGERC_SECTION', 'default'),
                             metavar='credentials_file_section', action='store',
-                            help=' Credentials file Section\'s name to use [$AKAMAI_EDGERC_SECTION]')
-        parser.add_argument('--accountkey', '--account-key', default=os.environ.get('AKAMAI_EDGERC_ACCOUNT_KEY', None),
-                            help=' Account Switch Key [$AKAMAI_EDGERC_ACCOUNT_KEY]')
+                            help=' Credentials file Section\'s name to use [$AKAMAI_EDGERC_SECTION]'),
+        parser.add_argument('--accountkey', '--account-key',
+                            default=os.environ.get('AKAMAI_EDGERC_ACCOUNT_KEY', None),
+                            help=' Account Switch Key [$AKAMAI_EDGERC_ACCOUNT_KEY]'),
+        parser.add_argument('--concurrency', type=_positive_int, default=8,
+                            help=' Maximum number of API requests sent in parallel (default: 8)'),
+        parser.add_argument('--verbose', '-v', default=False, action='store_true', help=' Verbose mode'),
+        parser.add_argument('--logfile', default=None, help=' Log file'),
+        parser.add_argument('--user-agent-prefix', dest='ua_prefix', default='Akamai-CLI', help=argparse.SUPPRESS),
+    ]
+
+def _add_log_arguments(event_parser):
+    event_parser.add_argument('log_type', nargs='?', default="access",
+                              choices=_LOG_TYPES, help="Log line type")
+    event_parser.add_argument('--start', '-s', type=int, help="Start datetime (EPOCH)")
+    event_parser.add_argument('--end', '-e', type=int, help="End datetime (EPOCH)")
+    event_parser.add_argument('--output', '-o', help="Output file, default is stdout. Encoding is utf-8.")
+    event_parser.add_argument('--json', '-j', action="store_true", default=False,
+                              help="Output as JSON instead of raw line")
+    event_parser.add_argument('--limit', type=int, default=5000,
+                              help="Size of logs to fetch in one API call. Max supported 5000")
+    event_parser.add_argument('--delay', type=int, default=600,
+                              help="Log delay is seconds, minimum is 600s")
+    event_parser.add_argument('--tail', '-f', action='store_true', default=False,
+                              help="""Do not stop when most recent log is reached,
+                              but rather to wait for additional data to be appended to the input.""")
+
+
+def _add_search_arguments(search_parser):
+    search_parser.add_argument('pattern', nargs='?')
+
+
+def _add_dir_arguments(dir_parser):
+    dir_parser.add_argument('directory_id', help="EAA Directory ID (e.g. dir://abcdefghi)", nargs='?')
+    subsub = dir_parser.add_subparsers(dest="action", help='Directory action (default is: list)')
+#        subsub.add_parser("list", help="List EAA directories")
 
-        parser.add_argument('--verbose', '-v', default=False, action='store_true', help=' Verbose mode')
-        parser.add_argument('--logfile', default=None, help=' Log file')
-        parser.add_argument('--user-agent-prefix', dest='ua_prefix', default='Akamai-CLI', help=argparse.SUPPRESS)
+    listgrp_parser = subsub.add_parser("list", help="List all groups existing in an EAA directory")
+    listgrp_parser.add_argument('--groups', '-g', action='store_true', default=True, help="Display users")
+    listgrp_parser.add_argument('--users', '-u', action='store_true', default=False, help="Display groups")
+    listgrp_parser.add_argument('--json', action='store_true', default=False, help="Output as JSON")
+    listgrp_parser.add_argument('--tail', '-f', action='store_true', default=False,
+                                help="Keep watching directory list, do not exit until Control+C/SIGTERM")
+    listgrp_parser.add_argument('search_pattern', nargs='?', help="Search pattern")
+
+    addgrp_parser = subsub.add_parser("addgroup", help="Add Group")
+    addgrp_parser.add_argument(
+        'dn',
+        help="Distinguished Name (when existing "
+             "group in directory as string or @file "
+             "for multiple DNs, eg. \"CN=Support,"
+             "CN=Users,DC=CONTOSO,DC=NET\"")
+
+    addovlgrp_parser = subsub.add_parser(
+        "addovlgroup",
+        help="Add Overlay Group")
+    addovlgrp_parser.add_argument('group', help="Group Name")
+
+    subsub.add_parser("sync", help="Synchronize directory")
+    syncgrp_parser = subsub.add_parser("syncgroup", help="Synchronize group")
+    syncgrp_parser.add_argument('group_uuid', help="Group UUID e.g. group://abcedf")
+    # mininterval | Undocumented argument
+    # Group synchronization will be ignored if the last request
+    # was performed before this amount of time in second. Use 0
+    # to force the synchronization. Default is 1800 seconds (30 minutes)
+    syncgrp_parser.add_argument('--mininterval', '-i', type=int, default=1800, help=argparse.SUPPRESS)
+    # retry | Undocumented argument
+    # Number of retry allowed if the sync command fails. Default: 0
+    syncgrp_parser.add_argument("--retry", "-r", type=int, default=0, help=argparse.SUPPRESS)
+
+
+def _add_app_arguments(app_parser):
+    # New: akamai eaa app xyz add_dnsexception www.abcd.efg
+    #      akamai eaa app xyz del_dnsexception www.abcd.efg
+    app_parser.add_argument(dest='application_id', help="Application ID, AppGroup ID or '-'")
+    subsub = app_parser.add_subparsers(dest="action", help='Application action')
+    # DNS exception add/remove
+    adddns_parser = subsub.add_parser("add_dnsexception", help="Add DNS Exception to tunnel-type client-app")
+    adddns_parser.add_argument(dest="exception_fqdn", metavar='fqdn', nargs="+", help='DNS exception FQDN')
+    deldns_parser = subsub.add_parser("del_dnsexception", help="Remove DNS Exception from tunnel-type client-app")
+    deldns_parser.add_argument(dest="exception_fqdn",  metavar='fqdn', nargs="+", help='DNS exception FQDN')
+    # Connector attach/detach
+    attcon_parser = subsub.add_parser("attach", help="Attach an EAA Connector to the application")
+    attcon_parser.add_argument(dest="connector_id", nargs="+",
+                               help='Attach one or multiple connectors to the application e.g. con://123456')
+    detcon_parser = subsub.add_parser("detach", help="Detach EAA Connector to the application")
+    detcon_parser.add_argument(dest="connector_id", nargs="+",
+                               help='Detach one or multiple connectors to the application, e.g. con://123456.')
+
+    deploy_parser = subsub.add_parser("deploy", help="Deploy the application")
+    deploy_parser.add_argument("--comment", "-c", nargs="?", default="Deploy from cli-eaa",
+                               help="Comment for the deployment")
+    update_parser = subsub.add_parser("update", help="Update an existing application")
+    update_parser.add_argument('--var', dest="variables", action='append', nargs='+', default=[])
+    create_parser = subsub.add_parser("create", help="Create a new application")
+    create_parser.add_argument('--var', dest="variables", default=[], action='append', nargs='+')
+    create_parser.add_argument('--quiet', '-q', action='store_true', default=False,
+                               help="Only print the ID of the new application, not its full configuration")
+    subsub.add_parser("delete", help="Delete an application")
+    subsub.add_parser("view", help="Dump application configuration (JSON)")
+    subsub.add_parser("viewgroups", help="View groups associated to application")
+    subsub.add_parser("delgroup", help="Remove group from application, appgroup ID must provided")
+    addgrp_parser = subsub.add_parser("addgroup", help="Add group(s) to application, app ID and appgroup ID must provided")
+    addgrp_parser.add_argument(dest="appgrp_id", nargs="+",
+                               help='Add group(s) to application')
+
+
+def _add_certificate_arguments(cert_parser):
+    cert_parser.add_argument(dest='certificate_id', nargs="?", default=None,
+                             help="Certificate ID (e.g. crt://abcdefghi)")
+    subsub = cert_parser.add_subparsers(dest="action", help='Certificate operation')
+    subsub.add_parser("list", help="List certificates")
+    subsub.add_parser("delete", help="Delete existing certificate")
+    subsub.add_parser("status", help="Display status of application/idp using the certificate")
+    certadd_parser = subsub.add_parser("rotate", help="Rotate existing certificate with a new one")
+    certadd_parser.add_argument('--cert', '-c', required=True, type=_readable_file,
+                                help="Certificate in PEM format")
+    certadd_parser.add_argument('--key', '-k', required=True, type=_readable_file, help="Private Key")
+    certadd_parser.add_argument('--passphrase', '--pass', '-p', help="Certificate passphrase")
+    certadd_parser.add_argument('--deployafter', '--deploy', '-d', action="store_true", default=False,
+                                help="Deploy impacted apps/idp after the rotation")
+
+
+def _add_report_arguments(report_parser):
+    # Pre 0.6.9
+    # report_parser.add_argument(dest='report_name', choices=['clients', 'last_access'], help="Report name")
+    subsub = report_parser.add_subparsers(dest="report_name", help='Report name')
+    subsub.add_parser("clients")
+    access_parser = subsub.add_parser("last_access")
+    access_parser.add_argument('--app', '-a', type=str, help="Application/IdP UUID")
+    access_parser.add_argument('--start', '-s', type=int, default=int(time.time() - 7 * 24 * 60 * 60),
+                               help="Start datetime (EPOCH), default is 1 week ago")
+    access_parser.add_argument('--end', '-e', type=int, default=int(time.time()), 
+                               help="End datetime (EPOCH), default is now")
+
+
+def _add_connector_arguments(con_parser):
+    con_parser.add_argument(dest='connector_id', nargs="?", default=None,
+                            help="Connector ID (e.g. con://abcdefghi)")
+    subsub = con_parser.add_subparsers(dest="action", help="Connector operation")
+    app_parser = subsub.add_parser("apps", help="List applications used by the connector")
+    app_parser.add_argument('--perf', default=False, action="store_true", help='Show performance metrics')
+
+    list_parser = subsub.add_parser("list", help="List all connectors")
+    list_parser.add_argument('--perf', default=False, action="store_true", help='Show performance metrics')
+    list_parser.add_argument('--json', '-j', default=False, action="store_true", help='View as JSON')
+    list_parser.add_argument('--showapps', '-a', default=False, action="store_true",
+                             help='Response contains the applications running on the connector (JSON only)')
+    list_parser.add_argument('--tail', '-f', default=False, action="store_true",
+                             help='Keep watching, do not exit until Control+C/SIGTERM')
+    list_parser.add_argument('--interval', '-i', default=300, type=float,
+                             help='Interval between update (works with --tail only)')
+    # subparsers.required = False
+    swap_parser = subsub.add_parser("swap", help="Swap connector with another one")
+    swap_parser.add_argument(dest="new_connector_id", help='New connector ID')
+    swap_parser.add_argument('--dryrun', dest="dryrun", action="store_true", default=False, help='Dry run mode')
+    
+    remove_parser = subsub.add_parser("remove", aliases=["rm"], help="Unregister a connector")
+    remove_parser.add_argument('--force', dest="force", action="store_true", default=False, help='Forcibly remove the connector from apps')
+
+    create_parser = subsub.add_parser("create", help="Create a new EAA connector")
+    create_parser.add_argument('--name', dest="connector_name", help='Name of the connector')
+    create_parser.add_argument('--description', dest="connector_description", help='Description of the connector')
+    create_parser.add_argument('--package', dest="connector_package", help='Package of the connector')
+    create_parser.add_argument('--debug', dest="connector_debug", default=False, action="store_true", help='Debug mode')
+    create_parser.add_argument('--wait', dest="connector_dl_wait", type=int, default=0, 
+                               help='''Max wait in seconds for the download URL to be available. 
+                                       If set to 0, will provide the connector info immediately after creation''')
+
+    allowlist_parser = subsub.add_parser("allowlist", 
+        help="Dump EAA Cloud Endpoint for Firewall/Proxy/Network Security equipement")
+    allowlist_parser.add_argument('--skip-header', dest="skip_header", action="store_true", default=False, 
+        help='Do not print CSV header (first row)')
+    allowlist_parser.add_argument('--used', dest="only_used", action="store_true", default=False, 
+        help='Show only endpoints being used by your EAA configurations')
+    allowlist_parser.add_argument('--fqdn', dest="fqdn", action="store_true", default=False, 
+        help='Show Hostname instead of IP/CIDR')
+    allowlist_parser.add_argument('--since-time', dest="since_time", default=None, 
+        help='Only print endpoints updated after a specific date (RFC3339)')
+
+
+
+def _add_info_arguments(info_parser):
+    info_parser.add_argument("--show-usage", dest="show_usage", action="store_true", default=False, 
+                             help="Show configuration count using each cloud zone")
+
+
+def _add_dp_arguments(dp_parser):
+    dp_parser.add_argument("dpcommand", choices=_DP_COMMANDS, default="inventory")
+    dp_parser.add_argument("--tail", "-f", default=False, action="store_true",
+                           help="Keep pulling the inventory every interval seconds")
+    dp_parser.add_argument("--interval", "-i", type=int, default=600,
+                           help="Pulling interval in seconds (default: 600)")
+    # Placeholder future json vs. flat output
+    dp_parser.add_argument("--json", "-j", action="store_true", default=True, help=argparse.SUPPRESS)
+
+#        dpdh = subparsers.add_parser('dp_devhist', help='Device Posture Device History (experimental)')
+#        $dpdh.add_argument("device_id")
+
+
+#: Subcommands with their aliases and help, in the order they are listed in the help,
+#: and the function registering their arguments
+_COMMANDS = (
+    (("log", "l"), "Fetch log events", _add_log_arguments),
+    (("search", "s"), "Search in EAA Application configurations", _add_search_arguments),
+    (("dir", "d"), "Manage EAA directories", _add_dir_arguments),
+    (("app", "a"), "Manage EAA applications", _add_app_arguments),
+    (("certificate", "cert"), "Manage EAA Certificates", _add_certificate_arguments),
+    (("report", "r"), "EAA reports", _add_report_arguments),
+    (("connector", "c", "con"), "Manage EAA connectors", _add_connector_arguments),
+    (("idp", "i"), "Manage EAA Identity Providers", None),
+    (("info",), "Display tenant info (cloud zone)", _add_info_arguments),
+    (("dp",), "Device Posture", _add_dp_arguments),
+    (("version",), "Display cli-eaa module version", None),
+)
+
+
+@lru_cache(maxsize=1)
+def _global_option_actions():
+    "Global options of the command line, keyed by option string."
+    parser = argparse.ArgumentParser(add_help=False)
+    return {option: action
+            for action in _add_global_arguments(parser)
+            for option in action.option_strings}
+
+
+def _scan_command(argv):
+    """
+    Return the subcommand found in argv, that is the first positional
+    argument once the global options and their values are skipped.
+    """
+    actions = _global_option_actions()
+    args = iter(argv)
+    for arg in args:
+        if arg == '--':
+            return next(args, None)
+        if not arg.startswith('-') or arg == '-':
+            return arg
+        if arg.startswith('--'):
+            if '=' in arg:
+                continue
+            if arg not in actions:
+                # argparse accepts unambiguous abbreviations of long options
+                matches = [option for option in actions if option.startswith(arg)]
+                if len(matches) == 1:
+                    arg = matches[0]
+            action = actions.get(arg)
+            if action is not None and action.nargs != 0:
+                next(args, None)
+        else:
+            # Cluster of short options (e.g. -vc section), only the last one may take the next argument
+            for position, flag in enumerate(arg[1:], 2):
+                action = actions.get('-' + flag)
+                if action is not None and action.nargs != 0:
+                    if position == len(arg):
+                        next(args, None)
+                    break
+    return None
+
+
+@lru_cache(maxsize=4)
+def _build_parser(command=None, extra_options=()):
+    """
+    Build the command line grammar.
+    Every subcommand is registered with its name, aliases and help so the
+    top level help and choices are complete, but only the selected one
+    gets its arguments. extra_options are the (name, action) pairs of the
+    options requested by the EdgeGridConfig caller.
+    A parser is built once per process for a given set of inputs.
+    """
+    parser = argparse.ArgumentParser(prog="akamai eaa",
+                                     description='Enterprise Application Access (EAA) for Akamai CLI')
+
+    subparsers = parser.add_subparsers(dest='command', help='Main command')
+    for names, command_help, add_arguments in _COMMANDS:
+        command_parser = subparsers.add_parser(names[0], aliases=list(names[1:]), help=command_help)
+        if add_arguments and command in names:
+            add_arguments(command_parser)
+
+    _add_global_arguments(parser)
+    for argument, action in extra_options:
+        parser.add_argument('--' + argument, action=action)
+
+    return parser
 
-        if flags:
-            for argument in flags.keys():
-                parser.add_argument('--' + argument, action=flags[argument])
 
-        arguments = {}
-        for argument in config_values:
-            if config_values[argument]:
-                if config_values[argument] == "False" or config_values[argument] == "True":
-                    parser.add_argument('--' + argument, action='count')
-                parser.add_argument('--' + argument)
-                arguments[argument] = config_values[argument]
+class EdgeGridConfig():
 
-        try:
-            args = parser.parse_args()
-        except Exception:
-            cli_exit_with_error(rc_error.GENERAL_ERROR)
+    def __init__(self, config_values, configuration, flags=None):
+        extra_options = tuple(flags.items()) if flags else ()
+        extra_options += tuple((argument, 'count' if value in ("False", "True") else 'store')
+                               for argument, value in config_values.items() if value)
+        parser = _build_parser(_scan_command(sys.argv[1:]), extra_options)
+        self.parser = parser
 
-        arguments = vars(args)
+        # argparse reports usage errors itself, with exit code 2
+        arguments = vars(parser.parse_args())
 
         if "section" in arguments and arguments["section"]:
             configuration = arguments["section"]
 
-        arguments["edgerc"] = os.path.expanduser(arguments["edgerc"])
-
-        if os.path.isfile(arguments["edgerc"]):
-            config = ConfigParser()
-            config.read_file(open(arguments["edgerc"]))
-            if not config.has_section(configuration):
+        if arguments["edgerc"] != _DEFAULT_EDGERC:
+            arguments["edgerc"] = os.path.expanduser(arguments["edgerc"])
+
+        # Commands that never call the API do not need the credentials
+        if arguments["command"] not in _OFFLINE_COMMANDS:
+            # One stat() tells both if the file is there and when it last changed
+            try:
+                edgerc_stat = os.stat(arguments["edgerc"])
+            except OSError:
+                edgerc_stat = None
+            if edgerc_stat is None or not stat.S_ISREG(edgerc_stat.st_mode):
+                err_msg = f"ERROR: EdgeRc configuration {arguments['edgerc']} not found.\n"
+                cli_exit_with_error(rc_error.EDGERC_MISSING.value, err_msg)
+
+            edgerc_sections = _load_edgerc(arguments["edgerc"], edgerc_stat.st_mtime_ns, edgerc_stat.st_size)
+            if configuration not in edgerc_sections:
                 err_msg = "ERROR: No section named %s was found in your %s file\n" % \
                           (configuration, arguments["edgerc"])
                 cli_exit_with_error(rc_error.EDGERC_SECTION_NOT_FOUND, err_msg)
 
-            for key, value in config.items(configuration):
-                # ConfigParser lowercases magically
-                if key not in arguments or arguments[key] is None:
-                    arguments[key] = value
-                else:
-                    print("Missing configuration file.")
-                    print("Run python gen_edgerc.py to get your credentials file set up "
-                          "once you've provisioned credentials in Akamai Control Center.")
-                    return None
-        else:
-            err_msg = f"ERROR: EdgeRc configuration {arguments['edgerc']} not found.\n"
-            cli_exit_with_error(rc_error.EDGERC_MISSING.value, err_msg)
-
-        for option in arguments:
-            setattr(self, option, arguments[option])
+            # Keys are lowercased and values interpolated like ConfigParser does,
+            # so they read the same as with the EdgeRc used for the API authentication.
+            # Command line arguments take precedence.
+            section_options = edgerc_sections[configuration]
+            for key, value in section_options.items():
+                if arguments.get(key) is not None:
+                    continue
+                try:
+                    arguments[key] = _interpolate(value, section_options)
+                except ValueError as invalid:
+                    err_msg = "ERROR: Invalid value of %s in section %s of your %s file: %s\n" % \
+                              (key, configuration, arguments["edgerc"], invalid)
+                    cli_exit_with_error(rc_error.GENERAL_ERROR, err_msg)
+
+        self.__dict__.update(arguments)
 
         if hasattr(self, 'eaa_api_host'):
             self.create_base_url()
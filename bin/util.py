@@ -1,14 +1,9 @@
 import sys
-import six
-from io import open
 
 
-# TODO: deprecated since cli-eaa requires python 3
-def force_unicode(s):
-    if six.PY2:
-        return unicode(s)
-    else:
-        return s
+def _nonblank(lines):
+    "Stripped lines, skipping the empty ones."
+    return (line for line in map(str.strip, lines) if line)
 
 
 def argument_tolist(arg):
@@ -16,11 +11,14 @@ def argument_tolist(arg):
         if item[0:1] == "@":
             filename = item[1:]
             if filename == "-":
-                for line in sys.stdin:
-                    yield force_unicode(line.strip())
+                if sys.stdin.isatty():
+                    # Interactive, handle each line as it is typed
+                    yield from _nonblank(sys.stdin)
+                else:
+                    yield from _nonblank(sys.stdin.read().splitlines())
             else:
-                with open(filename, "r") as f:
-                    for line in f:
-                        yield force_unicode(line.strip())
+                with open(filename, "r", encoding="utf-8") as f:
+                    lines = f.read().splitlines()
+                yield from _nonblank(lines)
         else:
-            yield force_unicode(item)
+            yield item
@@ -19,14 +19,38 @@ import json
 import os
 import string
 import random
+from functools import lru_cache
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock
 
 # cli-eaa
-from common import cli, BaseAPI, EAAInvalidMoniker, EAAItem, config, merge_dicts
+from common import cli, BaseAPI, EAAInvalidMoniker, EAAItem, config, merge_dicts, json_loads, json_pretty
 
 # 3rd party
 from jinja2 import Environment, FileSystemLoader
 
 logger = logging.getLogger(__name__)
+_sysrandom = random.SystemRandom()
+
+
+@lru_cache(maxsize=1)
+def _jinja_env():
+    """
+    Jinja2 environment of the configuration templates, created once per run.
+    The lookups of an ApplicationAPI are passed along with each template,
+    see ApplicationAPI.parse_template().
+    """
+    logger.debug("Jinja template loader base directory: %s", os.getcwd())
+    # Templates included from the working directory do not change during a run,
+    # no need to check them for changes each time they are used
+    env = Environment(loader=FileSystemLoader(os.getcwd()), auto_reload=False)
+    env.globals.update({
+        'AppProfile': ApplicationAPI.Profile,
+        'AppType': ApplicationAPI.Type,
+        'AppDomainType': ApplicationAPI.Domain,
+    })
+    return env
 
 
 class ApplicationAPI(BaseAPI):
@@ -79,159 +103,230 @@ class ApplicationAPI(BaseAPI):
     def __init__(self, config, api=BaseAPI.API_Version.OpenAPI):
         "Force the config arg to passed on."
         super(ApplicationAPI, self).__init__(config, api=api)
+        #: ETag of the application configurations loaded, if the API provides one
+        self._etags = {}
+        #: Lookup tables fetched for this instance, see _memoized()
+        self._memo = {}
+        self._memo_locks = {}
+        self._memo_lock = Lock()
+
+    @staticmethod
+    def app_url(app_moniker, *subpath):
+        "{OPEN} API path of an application, or of one of its sub-resources."
+        return '/'.join((f'mgmt-pop/apps/{app_moniker.uuid}',) + subpath)
 
     def process_command(self):
         """
         Process command passed from the CLI.
         """
+        action = self._config.action
         applications = list()
         appgroups = list()
         if self._config.application_id == '-':
             # nested if below because we don't do anything on create in this section
-            if self._config.action != 'create':
-                for line in sys.stdin:
-                    scanned_items = line.split(',')
-                    if len(scanned_items) == 0:
-                        logger.warning("Cannot parse line: %s" % line)
+            if action != 'create':
+                # Piped input is read at once, a terminal line by line as it is typed
+                lines = sys.stdin if sys.stdin.isatty() else sys.stdin.read().splitlines()
+                app_type = EAAItem.Type.Application
+                appgroup_type = EAAItem.Type.ApplicationGroupAssociation
+                app_scheme = app_type.scheme
+                appgroup_scheme = appgroup_type.scheme
+                for line in lines:
+                    # Only the first column matters, e.g. output of 'akamai eaa search'
+                    scanned_item = line.split(',', 1)[0].strip()
+                    if not scanned_item:
                         continue
-                    try:
-                        scanned_obj = EAAItem(scanned_items[0])
-                        if scanned_obj.objtype == EAAItem.Type.Application:
-                            applications.append(scanned_obj)
-                        elif scanned_obj.objtype == EAAItem.Type.ApplicationGroupAssociation:
-                            appgroups.append(scanned_obj)
-                    except EAAInvalidMoniker:
-                        logger.warning("Invalid application moniker: %s" % scanned_items[0])
+                    # Dispatch the expected monikers on their prefix
+                    if scanned_item.startswith(app_scheme):
+                        applications.append(EAAItem.from_uuid(app_type, scanned_item[len(app_scheme):]))
+                    elif scanned_item.startswith(appgroup_scheme):
+                        appgroups.append(EAAItem.from_uuid(appgroup_type, scanned_item[len(appgroup_scheme):]))
+                    else:
+                        try:
+                            EAAItem(scanned_item)  # Other objects are ignored, invalid ones reported
+                        except EAAInvalidMoniker:
+                            logger.warning("Invalid application moniker: %s", scanned_item)
         else:
-            logger.info("Single app %s" % config.application_id)
-            applications.append(EAAItem(config.application_id))
-            logger.info("%s" % EAAItem(config.application_id))
-
-        if config.action == "deploy":
-            for a in applications:
-                self.deploy(a, config.comment)
+            app_moniker = EAAItem(config.application_id)
+            applications.append(app_moniker)
+            logger.info("Single app %s", app_moniker)
+
+        if action == "deploy":
+            comment = config.comment
+            deployments = self.map_concurrent(lambda a: self.deploy(a, comment), applications)
+            for a, _ in zip(applications, deployments):
                 cli.print("Application %s deployment requested, it may take a few minutes before it gets live." % a)
-        elif config.action == "create":
+        elif action == "create":
             # new_config = json.load(sys.stdin)
             new_config = sys.stdin.read()
             self.create(new_config)
-        elif config.action == "update":
+        elif action == "update":
             if len(applications) > 1:
                 raise Exception("Batch operation not supported")
             app = applications[0]
             new_config = sys.stdin.read()
             self.update(app, new_config)
             cli.print("Configuration for application %s has been updated." % app)
-        elif config.action == "delete":
-            for a in applications:
-                self.delete_app(a)
-        elif config.action == "add_dnsexception":
-            for a in applications:
-                self.add_dnsexception(a)
-        elif config.action == "del_dnsexception":
-            for a in applications:
-                self.del_dnsexception(a)
-        elif config.action == 'viewgroups':
-            for a in applications:
-                self.loadgroups(a)
-        elif config.action == 'delgroup':
-            for a in applications:
-                self.delgroup(a)
-        elif config.action == 'addgroup':
-            for a in applications:
-                appgrps = []
-                for ag in set(config.appgrp_id):
-                    appgrp_moniker = EAAItem(ag)
-                    appgrps.append(appgrp_moniker.uuid)
-                self.addgroup(a, appgrps)
-        elif config.action in ('attach', 'detach'):
-            for a in applications:
-                connectors = []
-                for c in set(config.connector_id):
-                    con_moniker = EAAItem(c)
-                    if con_moniker.objtype is not EAAItem.Type.Connector:
-                        raise TypeError("Invalid type of connector: %s" % c)
-                    connectors.append({"uuid_url": con_moniker.uuid})
-                if config.action == 'attach':
-                    self.attach_connectors(a, connectors)
-                elif config.action == 'detach':
-                    self.detach_connectors(a, connectors)
+        elif action == "delete":
+            list(self.map_concurrent(self.delete_app, applications))
+        elif action in ("add_dnsexception", "del_dnsexception"):
+            if action == "add_dnsexception":
+                update_dnsexception = self.add_dnsexception
+            else:
+                update_dnsexception = self.del_dnsexception
+            list(self.map_concurrent(update_dnsexception, applications))
+        elif action == 'viewgroups':
+            # Fetched concurrently, displayed one application after the other
+            for a, allowed_groups in zip(applications, self.map_concurrent(self.fetchgroups, applications)):
+                self.loadgroups(a, allowed_groups)
+        elif action == 'delgroup':
+            list(self.map_concurrent(self.delgroup, applications))
+        elif action == 'addgroup':
+            # Parsed once for all the applications, duplicates removed in the order given
+            appgrps = list(dict.fromkeys(EAAItem(ag).uuid for ag in config.appgrp_id))
+            list(self.map_concurrent(lambda a: self.addgroup(a, appgrps), applications))
+        elif action in ('attach', 'detach'):
+            connector_uuids = {}  # Ordered set, see addgroup above
+            for c in config.connector_id:
+                con_moniker = EAAItem(c)
+                if con_moniker.objtype is not EAAItem.Type.Connector:
+                    raise TypeError("Invalid type of connector: %s" % c)
+                connector_uuids[con_moniker.uuid] = None
+            connectors = [{"uuid_url": con_uuid} for con_uuid in connector_uuids]
+            if action == 'attach':
+                list(self.map_concurrent(lambda a: self.attach_connectors(a, connectors), applications))
+            elif action == 'detach':
+                list(self.map_concurrent(lambda a: self.detach_connectors(a, connectors), applications))
         else:  # view by default
-            for a in applications:
-                app_config = self.load(a)
-                print(json.dumps(app_config))
-                # print(app_config)
+            # Buffered, one document per line, written out by the stdout buffer
+            for app_config in self.map_concurrent(self.load, applications):
+                cli.print_json(app_config, flush=False)
+            sys.stdout.flush()
 
-    def load(self, app_moniker, expand=True):
+    def map_concurrent(self, fn, items):
+        """
+        Apply `fn` to each item, the applications being independent from
+        each other, on up to --concurrency threads sharing the API session.
+        Results are yielded in the order of the items as soon as available.
+        Like a sequential loop, the batch stops at the first failure (e.g. cli.exit):
+        the items not started yet are cancelled, and the error is raised once the
+        results of the items before it have been yielded.
+        """
+        futures = []
+        failed = Event()
+        lock = Lock()
+
+        def stop_on_failure(future):
+            if not future.cancelled() and future.exception() is not None:
+                with lock:
+                    failed.set()
+                    for pending in futures:
+                        pending.cancel()
+
+        with ThreadPoolExecutor(max_workers=self._config.concurrency) as executor:
+            try:
+                for item in items:
+                    with lock:
+                        if failed.is_set():
+                            break
+                        future = executor.submit(fn, item)
+                        futures.append(future)
+                    future.add_done_callback(stop_on_failure)
+                for future in futures:
+                    yield future.result()
+            finally:
+                # Also when the caller stops iterating early
+                for future in futures:
+                    future.cancel()
+
+    def load(self, app_moniker, expand=True, include_groups=True, include_urllocation=True):
         """
         Load application configuration.
         :param expand: Set to True if you need extra details on inner objects (default is True)
+        :param include_groups: With expand, merge the groups allowed to access the app (default is True)
+        :param include_urllocation: With expand, merge the URL path-based policies (default is True)
         """
         # For the save/duplicate-type operations we need some extra data,
         # hence the two expand parameters
         url_params = {}
         if expand:
             url_params = {'expand': expand, 'expand_sdk': expand}
-        url = 'mgmt-pop/apps/{applicationId}'.format(applicationId=app_moniker.uuid)
-        result = self.get(url, params=url_params)
-        app_config = result.json()
-
-        if expand:
-
-            # Merge application groups info and align the view
-            # to match the structure expected in save operation
-            groups_url = 'mgmt-pop/apps/{applicationId}/groups'.format(applicationId=app_moniker.uuid)
-            groups_result = self.get(groups_url, params={'limit': 0})
-            groups = groups_result.json()
-            app_config['groups'] = []
-            for g in groups.get('objects', []):
-                app_config['groups'].append(
-                    {
-                        'name': g.get('group', {}).get('name'),
+        else:
+            include_groups = include_urllocation = False
+        if not (include_groups or include_urllocation):
+            # A single GET, often from a worker of a --concurrency pool already
+            return self._get_app(app_moniker, url_params)
+
+        # The app, its groups and its URL path-based policies are independent resources,
+        # fetch them at the same time
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            if include_groups:
+                groups_result = executor.submit(self.get, self.app_url(app_moniker, 'groups'), params={'limit': 0})
+            if include_urllocation:
+                upp_result = executor.submit(self.get, self.app_url(app_moniker, 'urllocation'), params={'limit': 0})
+            app_config = self._get_app(app_moniker, url_params)
+
+            if include_groups:
+                # Merge application groups info and align the view
+                # to match the structure expected in save operation
+                groups = self.parse_json(groups_result.result()).get('objects', [])
+                app_groups = app_config['groups'] = []
+                for g in groups:
+                    group = g.get('group', {})
+                    app_groups.append({
+                        'name': group.get('name'),
                         'enable_mfa': g.get('enable_mfa', 'inherit'),
-                        'uuid_url': g.get('group', {}).get('group_uuid_url')
-                    }
-                )
+                        'uuid_url': group.get('group_uuid_url')
+                    })
 
-            # Merge URL path-based policies and align the view
-            # to match the structure expected in save operation
-            upp_url = 'mgmt-pop/apps/{applicationId}/urllocation'
-            upp_result = self.get(upp_url.format(applicationId=app_moniker.uuid), params={'limit': 0})
-            upp = upp_result.json()
-            app_config['urllocation'] = []
-            for upp_rule in upp.get('objects', []):
-                app_config['urllocation'].append(upp_rule)
+            if include_urllocation:
+                # Merge URL path-based policies and align the view
+                # to match the structure expected in save operation
+                # The policies are passed through as-is, no copy needed
+                app_config['urllocation'] = self.parse_json(upp_result.result()).get('objects', [])
 
         return app_config
 
-    def loadgroups(self, app_moniker):
-        """Directory+Groups allowed to access this application."""
+    def _get_app(self, app_moniker, url_params):
+        "Application configuration alone, its ETag kept for a later update."
+        result = self.get(self.app_url(app_moniker), params=url_params)
+        self._etags[app_moniker.uuid] = result.headers.get('ETag')
+        return self.parse_json(result)
+
+    def fetchgroups(self, app_moniker):
+        """Fetch the Directory+Groups allowed to access this application."""
         url_params = {'limit': 0, 'expand': 'true', 'expand_sdk': 'true'}
-        url = 'mgmt-pop/apps/{applicationId}/groups'.format(applicationId=app_moniker.uuid)
+        url = self.app_url(app_moniker, 'groups')
         result = self.get(url, url_params)
-        count = 0
-        allowed_groups = result.json().get('objects')
+        return self.parse_json(result).get('objects')
+
+    def loadgroups(self, app_moniker, allowed_groups=None):
+        """
+        Directory+Groups allowed to access this application.
+        :param allowed_groups: groups already fetched with fetchgroups()
+        """
+        if allowed_groups is None:
+            allowed_groups = self.fetchgroups(app_moniker)
         if not self._config.batch:
             cli.header("# Allowed Groups to access app %s" % app_moniker)
             cli.header("# appgroup_id,group_id,group_name,dir_name,mfa")
-        for count, group in enumerate(allowed_groups, start=1):
-            association = group.get('resource_uri', {}).get('href')
-            cli.print("{prefix1}{appgroup_id},{prefix2}{group_id},{name},{dir_name},{mfa}".format(
-                prefix1=EAAItem.Type.ApplicationGroupAssociation.scheme,
-                appgroup_id=association.split('/')[-1],
-                prefix2=EAAItem.Type.Group.scheme,
-                group_id=group.get('group').get('group_uuid_url'),
-                name=group.get('group').get('name'),
-                dir_name=group.get('group').get('dir_name'),
-                mfa=group.get('enable_mfa')
-            ))
+        prefix1 = EAAItem.Type.ApplicationGroupAssociation.scheme
+        prefix2 = EAAItem.Type.Group.scheme
+        rows = []  # Written at once, not one write per group
+        for group in allowed_groups:
+            appgroup_id = group.get('resource_uri', {}).get('href').rsplit('/', 1)[-1]
+            g = group.get('group')
+            rows.append(f"{prefix1}{appgroup_id},{prefix2}{g.get('group_uuid_url')},"
+                        f"{g.get('name')},{g.get('dir_name')},{group.get('enable_mfa')}")
+        if rows:
+            cli.print("\n".join(rows))
 
         if not self._config.batch:
-            cli.print("# %s groups configured to access application %s" % (count, app_moniker))
+            cli.print("# %s groups configured to access application %s" % (len(rows), app_moniker))
         return allowed_groups
 
     def delete_app(self, app_moniker):
-        deletion = self.delete('mgmt-pop/apps/{applicationId}'.format(applicationId=app_moniker.uuid))
+        deletion = self.delete(self.app_url(app_moniker))
         if deletion.status_code == 200:
             cli.print("Application %s deleted." % app_moniker.uuid)
 
@@ -249,79 +344,124 @@ class ApplicationAPI(BaseAPI):
         if addition.status_code == 200:
             cli.print("Association %s added." % (', '.join(appgrps)))
 
+    def _memoized(self, fetch, *args):
+        """
+        Result of fetch(*args), fetched once per instance.
+        Concurrent callers wait for the first one rather than sending the same request.
+        """
+        key = (fetch.__name__,) + args
+        with self._memo_lock:
+            memo_lock = self._memo_locks.setdefault(key, Lock())
+        with memo_lock:
+            if key not in self._memo:
+                self._memo[key] = fetch(*args)
+        return self._memo[key]
+
+    def _cloudzones(self):
+        """
+        Cloud zone UUID by name, a template typically looks up the same
+        few cloud zones many times, cloudzone_lookup() only fetches them once.
+        """
+        cloudzones = {}
+        pops = self.get('mgmt-pop/pops?shared=true')
+        for pop in self.parse_json(pops).get('objects'):
+            cloudzones.setdefault(pop.get('region'), pop.get('uuid_url'))
+        return cloudzones
+
+    def _certificates(self):
+        "Certificate UUID by CN, see _cloudzones()."
+        certificates = {}
+        certs = self.get('mgmt-pop/certificates?limit=0')
+        for cert in self.parse_json(certs).get('objects'):
+            certificates.setdefault(cert.get('cn'), cert.get('uuid_url'))
+        return certificates
+
     def cloudzone_lookup(self, name):
         """Lookup a cloud zone UUID based on it's name."""
-        pops = self.get('mgmt-pop/pops?shared=true')
-        for pop in pops.json().get('objects'):
-            if pop.get('region') == name:
-                return pop.get('uuid_url')
-        return ""
+        return self._memoized(self._cloudzones).get(name, "")
 
     def certificate_lookup(self, cn):
-        certs = self.get('mgmt-pop/certificates?limit=0')
-        for cert in certs.json().get('objects'):
-            if cert.get('cn') == cn:
-                return cert.get('uuid_url')
-        return ""
+        return self._memoized(self._certificates).get(cn, "")
+
+    @staticmethod
+    def by_name(objects):
+        "Index API objects by name, the first one wins like a scan of the list would."
+        named = {}
+        for obj in objects or []:
+            named.setdefault(obj.get('name'), obj)
+        return named
+
+    def _connectors(self):
+        "Connector UUID by name, see _cloudzones()."
+        connectors = {}
+        agents = self.get('mgmt-pop/agents?limit=100')
+        for agent in self.parse_json(agents).get('objects'):
+            connectors.setdefault(agent.get('name'), agent.get('uuid_url'))
+        return connectors
+
+    def _idps(self):
+        "Identity providers by name, see _cloudzones()."
+        idps = self.get('mgmt-pop/idp?limit=100')
+        return self.by_name(self.parse_json(idps).get('objects'))
+
+    def _directories(self):
+        "Directories by name, see _cloudzones()."
+        directories = self.get('mgmt-pop/directories?limit=100')
+        return self.by_name(self.parse_json(directories).get('objects'))
+
+    def _groups(self, directory_uuid):
+        "Groups of a directory by name, see _cloudzones()."
+        groups = self.get(f'mgmt-pop/directories/{directory_uuid}/groups')
+        return self.by_name(self.parse_json(groups).get('objects'))
 
     def connector_lookup(self, name):
-        agents = self.get('mgmt-pop/agents?limit=100')
-        for agent in agents.json().get('objects'):
-            if agent.get('name') == name:
-                return agent.get('uuid_url')
-        return ""
+        return self._memoized(self._connectors).get(name, "")
     
     def idp_lookup(self, name):
-        idps = self.get('mgmt-pop/idp?limit=100')
-        for idp in idps.json().get('objects'):
-            if idp.get('name') == name:
-                logger.debug(json.dumps(idp, indent=2))
-                return idp
-        return None
+        idp = self._memoized(self._idps).get(name)
+        if idp and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json_pretty(idp))
+        return idp
 
     def directory_lookup(self, name):
-        directories = self.get('mgmt-pop/directories?limit=100')
-        for dir in directories.json().get('objects'):
-            if dir.get('name') == name:
-                logger.debug(json.dumps(dir, indent=2))
-                return dir
-        return None
+        dir = self._memoized(self._directories).get(name)
+        if dir and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json_pretty(dir))
+        return dir
     
     def group_lookup(self, directory_uuid, group_name):
-        logger.debug(f"group_lookup: looking for {group_name} in directory {directory_uuid}...")
-        url = 'mgmt-pop/directories/{directory_uuid}/groups'.format(directory_uuid=directory_uuid)     
-        groups = self.get(url)
-        for g in groups.json().get('objects'):
-            if g.get('name') == group_name:
-                logger.debug("### FOUND GROUP")
-                logger.debug(json.dumps(g, indent=2))
-                return g
-        return None
+        logger.debug("group_lookup: looking for %s in directory %s...", group_name, directory_uuid)
+        # Fetched once per directory
+        g = self._memoized(self._groups, directory_uuid).get(group_name)
+        if g:
+            logger.debug("### FOUND GROUP")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(json_pretty(g))
+        return g
     
     def random_string(self, length):
         characters = string.ascii_lowercase + string.digits
-        return ''.join(random.choice(characters) for _ in range(length))
+        # OS entropy, and all the characters drawn in one call
+        return ''.join(_sysrandom.choices(characters, k=length))
 
     def parse_template(self, raw_config):
         """
         Parse the EAA configuration as JINJA2 template
         """
-        logger.debug("Jinja template loader base directory: %s" % os.getcwd())
-        t = Environment(loader=FileSystemLoader(os.getcwd())).from_string(raw_config)
-        t.globals['AppProfile'] = ApplicationAPI.Profile
-        t.globals['AppType'] = ApplicationAPI.Type
-        t.globals['AppDomainType'] = ApplicationAPI.Domain
-        t.globals['cli_cloudzone'] = self.cloudzone_lookup
-        t.globals['cli_certificate'] = self.certificate_lookup
-        t.globals['cli_connector'] = self.connector_lookup
-        t.globals['cli_idp'] = self.idp_lookup
-        t.globals['cli_directory'] = self.directory_lookup
-        t.globals['cli_group'] = self.group_lookup
-        t.globals['cli_randomstring'] = self.random_string
+        t = _jinja_env().from_string(raw_config, globals={
+            'cli_cloudzone': self.cloudzone_lookup,
+            'cli_certificate': self.certificate_lookup,
+            'cli_connector': self.connector_lookup,
+            'cli_idp': self.idp_lookup,
+            'cli_directory': self.directory_lookup,
+            'cli_group': self.group_lookup,
+            'cli_randomstring': self.random_string
+        })
         output = t.render(**dict(self._config.variables))
-        logger.debug("JSON Post-Template Render:")
-        for lineno, line in enumerate(output.splitlines()):
-            logger.debug("{:4d}> {}".format(lineno+1, line))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("JSON Post-Template Render:")
+            for lineno, line in enumerate(output.splitlines(), start=1):
+                logger.debug("%4d> %s", lineno, line)
         return output
 
     def create(self, raw_app_config):
@@ -334,8 +474,9 @@ class ApplicationAPI(BaseAPI):
               "name":"test app","description":"This is my test app"}
               We should do the same here
         """
-        app_config = json.loads(self.parse_template(raw_app_config))
-        logger.debug("Post Jinja parsing:\n%s" % json.dumps(app_config))
+        app_config = json_loads(self.parse_template(raw_app_config))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Post Jinja parsing:\n%s", json.dumps(app_config))
         app_config_create = {
             "app_profile": app_config.get('app_profile'),
             "app_type": app_config.get('app_type', ApplicationAPI.Type.Hosted.value),
@@ -353,16 +494,18 @@ class ApplicationAPI(BaseAPI):
             with open(f"1_POST_{app_config.get('name')}.json", "w") as outfile:
                 outfile.write(json_object)
 
-        logger.info("Create app core: %s %s" % (newapp.status_code, newapp.text))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Create app core: %s %s", newapp.status_code, newapp.text)
         if newapp.status_code != 200:
             cli.exit(2)
-        newapp_config = newapp.json()
-        logger.info("New app JSON:\n%s" % newapp.text)
-        app_moniker = EAAItem("app://{}".format(newapp_config.get('uuid_url')))
-        logger.info("UUID of the newapp: %s" % app_moniker)
+        newapp_config = self.parse_json(newapp)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("New app JSON:\n%s", newapp.text)
+        app_moniker = EAAItem.from_uuid(EAAItem.Type.Application, newapp_config.get('uuid_url'))
+        logger.info("UUID of the newapp: %s", app_moniker)
 
         # Now we push everything else as a PUT (update)
-        self.put('mgmt-pop/apps/{applicationId}'.format(applicationId=app_moniker.uuid), json=app_config)
+        self.put(self.app_url(app_moniker), json=app_config)
 
         if config.debug:
             json_object = json.dumps(app_config, indent=4)        
@@ -372,23 +515,46 @@ class ApplicationAPI(BaseAPI):
         # Sub-components of the application configuration definition
 
         # --- Connectors
-        if app_config.get('agents'):
-            self.attach_connectors(app_moniker, app_config.get('agents', []))
+        # Attached in the background, on their own connection of the session pool,
+        # the other sub-components don't depend on them
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            if app_config.get('agents'):
+                attached = executor.submit(self.attach_connectors, app_moniker, app_config.get('agents', []))
+            else:
+                attached = None
+
+            # IdP, Directories, Groups
+            self.create_auth(app_moniker, app_config)
 
-        # IdP, Directories, Groups
-        self.create_auth(app_moniker, app_config)
+            # --- Access Control rules
+            self.set_acl(app_moniker, app_config)
 
-        # --- Access Control rules
-        self.set_acl(app_moniker, app_config)
+            # --- Other services
+            # TODO: implement
 
-        # --- Other services
-        # TODO: implement
+            # URL based policies
+            self.create_urlbasedpolicies(app_moniker, app_config)
 
-        # URL based policies
-        self.create_urlbasedpolicies(app_moniker, app_config)
+            if attached:
+                attached.result()
 
-        # At the end we reload the app entirely
-        cli.print(json.dumps(self.load(app_moniker)))
+        if self._config.quiet:
+            # Scripts only need the ID, no need to fetch the configuration back
+            cli.print(app_moniker)
+        else:
+            # At the end we reload the app entirely
+            cli.print_json(self.load(app_moniker))
+
+    @staticmethod
+    def services_by_type(services):
+        """
+        Index a list of application services by service type.
+        There is only one service of each type, e.g. ACL.
+        """
+        by_type = {}
+        for s in services:
+            by_type.setdefault(s.get('service', {}).get('service_type'), s)
+        return by_type
 
     def set_acl(self, app_moniker, app_config):
         """
@@ -396,57 +562,57 @@ class ApplicationAPI(BaseAPI):
         :param app_moniker: identifier of the newly created app
         :app_config: details of the configuration to save
         """
+        # Obtain ACL service details from the input configuration,
+        # without any there is nothing to fetch nor save
+        config_services = ApplicationAPI.services_by_type(app_config.get('Services', []))
+        logger.info("Scanned service_type: %s", list(config_services))
+        service_acl = config_services.get(ApplicationAPI.ServiceType.ACL.value)
+
+        if not service_acl:
+            logger.warning("No acl rules defined in the application configuration JSON document, skipping")
+            return
+
         # UUID for the ACL service in the newly created application
         logger.debug("Fetch service UUID...")
-        services_resp = self.get('mgmt-pop/apps/{app_uuid}/services'.format(app_uuid=app_moniker.uuid))
-        service_uuid = None
-        logger.info(json.dumps(services_resp.json(), indent=4))
-        for s in services_resp.json().get('objects', []):
-            scanned_service_type = s.get('service', {}).get('service_type')
-            logger.debug("Scanned service_type: %s" % scanned_service_type)
-            if scanned_service_type == ApplicationAPI.ServiceType.ACL.value:
-                service_uuid = s.get('service', {}).get('uuid_url')
-                break  # Only one service of type ACL
-        logger.debug("Service UUID for the app is %s" % service_uuid)
+        services_resp = self.get(self.app_url(app_moniker, 'services'))
+        services = self.parse_json(services_resp)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json_pretty(services))
+        app_services = ApplicationAPI.services_by_type(services.get('objects', []))
+        logger.debug("Scanned service_type: %s", list(app_services))
+        service_uuid = app_services.get(ApplicationAPI.ServiceType.ACL.value, {}).get('service', {}).get('uuid_url')
+        logger.debug("Service UUID for the app is %s", service_uuid)
 
         if service_uuid:
 
-            # Obtain ACL service details from the input configuration
-            service_acl = None
-            for s in app_config.get('Services', []):
-                scanned_service_type = s.get('service', {}).get('service_type')
-                logger.info("Scanned service_type: %s" % scanned_service_type)
-                if scanned_service_type == ApplicationAPI.ServiceType.ACL.value:
-                    service_acl = s
-                    break  # Only one service of type ACL
-
-            if not service_acl:
-                logger.warning("No acl rules defined in the application configuration JSON document, skipping")
-                return
-
             # Enable the ACL service
             # payload = {"uuid_url":"fJZ7A0emQWijZ40mxB3dWw","description":null,"name":"Access Control",
             # service_type":6,"settings":{},"status":"on"}
             payload = service_acl.get('service')
             payload['uuid_url'] = service_uuid
-            self.put(
-                'mgmt-pop/services/{service_uuid}'.format(service_uuid=service_uuid),
-                json=payload
-            )
-
-            for acl_rule in service_acl.get('access_rules', []):
-                # Step 1 create the Rules to get the corresponding UUID
-                new_acl_rule = self.post(
-                    'mgmt-pop/services/{service_uuid}/rules'.format(service_uuid=service_uuid),
-                    json={"rule_type": acl_rule.get('rule_type', 1), "name": acl_rule.get('name')}
-                )
-                new_acl_rule_uuid = new_acl_rule.json().get('uuid_url')
-                # Step 2 save the details of the rules
-                self.put('mgmt-pop/rules/{rule_uuid}'.format(rule_uuid=new_acl_rule_uuid), json=acl_rule)
+            self.put(f'mgmt-pop/services/{service_uuid}', json=payload)
+
+            # Rules are created one after the other to keep their order, the details of
+            # each rule are saved in the background while the next one is created
+            rules_url = f'mgmt-pop/services/{service_uuid}/rules'
+            with ThreadPoolExecutor(max_workers=self._config.concurrency) as executor:
+                rule_updates = []
+                for acl_rule in service_acl.get('access_rules', []):
+                    # Step 1 create the Rules to get the corresponding UUID
+                    new_acl_rule = self.post(
+                        rules_url,
+                        json={"rule_type": acl_rule.get('rule_type', 1), "name": acl_rule.get('name')}
+                    )
+                    new_acl_rule_uuid = self.parse_json(new_acl_rule).get('uuid_url')
+                    # Step 2 save the details of the rules
+                    rule_updates.append(executor.submit(
+                        self.put, f'mgmt-pop/rules/{new_acl_rule_uuid}', json=acl_rule))
+                for rule_update in rule_updates:
+                    rule_update.result()
 
         else:
 
-            logger.warning("Unable to find a ACL service in the newly created application %s" % app_moniker)
+            logger.warning("Unable to find a ACL service in the newly created application %s", app_moniker)
 
     def create_auth(self, app_moniker, app_config):
         """
@@ -455,50 +621,59 @@ class ApplicationAPI(BaseAPI):
         """
         # IdP
         # The "view" operation gives us the IdP in idp -> idp_id
-        scanned_idp_uuid = app_config.get('idp', {}).get('idp_id')
-        if scanned_idp_uuid:
-            idp_app_payload = {"app": app_moniker.uuid, "idp": scanned_idp_uuid}
-            idp_app_resp = self.post('mgmt-pop/appidp', json=idp_app_payload)
-            logger.info("IdP-app association response: %s %s" % (idp_app_resp.status_code, idp_app_resp.text))
-
-        # Directory
-        # The view operation gives us the directories in directories[] -> uuid_url
-        scanned_directories = app_config.get('directories', [])
-        app_directories_payload = {"data": [{"apps": [app_moniker.uuid], "directories": scanned_directories}]}
-        app_directories_resp = self.post('mgmt-pop/appdirectories', json=app_directories_payload)
-        logger.info(
-            "App directories association response: %s %s" %
-            (app_directories_resp.status_code, app_directories_resp.text)
-        )
-        if app_directories_resp.status_code != 200:
-            cli.exit(2)
-
-        # Groups
-        self.set_appgroups(app_moniker, app_config)
+        # The IdP association is independent from the directories/groups below,
+        # it is sent in the background
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            scanned_idp_uuid = app_config.get('idp', {}).get('idp_id')
+            if scanned_idp_uuid:
+                idp_app_payload = {"app": app_moniker.uuid, "idp": scanned_idp_uuid}
+                idp_app_resp = executor.submit(self.post, 'mgmt-pop/appidp', json=idp_app_payload)
+
+            # Directory
+            # The view operation gives us the directories in directories[] -> uuid_url
+            scanned_directories = app_config.get('directories', [])
+            app_directories_payload = {"data": [{"apps": [app_moniker.uuid], "directories": scanned_directories}]}
+            app_directories_resp = self.post('mgmt-pop/appdirectories', json=app_directories_payload)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("App directories association response: %s %s",
+                            app_directories_resp.status_code, app_directories_resp.text)
+            if app_directories_resp.status_code != 200:
+                cli.exit(2)
+
+            # Groups, they belong to the directories associated above,
+            # the application being new there are no existing groups to fetch
+            self.set_appgroups(app_moniker, app_config, existing_groups=[])
+
+            if scanned_idp_uuid:
+                idp_app_resp = idp_app_resp.result()
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("IdP-app association response: %s %s",
+                                idp_app_resp.status_code, idp_app_resp.text)
 
     def create_urlbasedpolicies(self, app_moniker, app_config):
         if len(app_config.get('urllocation', [])) > 0:
-            upp_url = 'mgmt-pop/apps/{applicationId}/urllocation'.format(applicationId=app_moniker.uuid)
-            for upp_rule in app_config.get('urllocation', []):
-
-                # First we create the URL Policy url skeleton
-                upp_create_payload = {
-                    "rule_type": upp_rule.get("rule_type", 1),
-                    "name": upp_rule.get("name"),
-                    "url": upp_rule.get("url")
-                }
-                upp_create = self.post(upp_url, json=upp_create_payload)
-                upp_create_data = upp_create.json()
-
-                if upp_create_data.get('uuid_url'):
-                    upp_update_url = 'mgmt-pop/apps/{applicationId}/urllocation/{ruleId}'
-                    # Merge incoming settings with default set by backend provided
-                    put_payload = merge_dicts(upp_create_data, upp_rule)
-                    self.put(upp_update_url.format(
-                        applicationId=app_moniker.uuid,
-                        ruleId=upp_create_data.get('uuid_url')),
-                        json=put_payload
-                    )
+            upp_url = self.app_url(app_moniker, 'urllocation')
+            # Like the ACL rules, created in order and updated in the background
+            with ThreadPoolExecutor(max_workers=self._config.concurrency) as executor:
+                upp_updates = []
+                for upp_rule in app_config.get('urllocation', []):
+
+                    # First we create the URL Policy url skeleton
+                    upp_create_payload = {
+                        "rule_type": upp_rule.get("rule_type", 1),
+                        "name": upp_rule.get("name"),
+                        "url": upp_rule.get("url")
+                    }
+                    upp_create = self.post(upp_url, json=upp_create_payload)
+                    upp_create_data = self.parse_json(upp_create)
+
+                    if upp_create_data.get('uuid_url'):
+                        upp_update_url = f"{upp_url}/{upp_create_data.get('uuid_url')}"
+                        # Merge incoming settings with default set by backend provided
+                        put_payload = merge_dicts(upp_create_data, upp_rule)
+                        upp_updates.append(executor.submit(self.put, upp_update_url, json=put_payload))
+                for upp_update in upp_updates:
+                    upp_update.result()
         else:
             logger.debug("No URL path-based policies set")
 
@@ -508,7 +683,7 @@ class ApplicationAPI(BaseAPI):
         """
         postjj_app_config = self.parse_template(raw_app_config)
         try:
-            app_config = json.loads(postjj_app_config)
+            app_config = json_loads(postjj_app_config)
         except json.decoder.JSONDecodeError as jde:
             for lineno, line in enumerate(postjj_app_config.splitlines()):
                 logger.error("{:4d}> {}".format(lineno+1, line))
@@ -516,20 +691,29 @@ class ApplicationAPI(BaseAPI):
 
         # App core property update
         update = self.put(
-            'mgmt-pop/apps/{applicationId}'.format(applicationId=app_moniker.uuid),
+            self.app_url(app_moniker),
             json=app_config
         )
-        logger.info(f"Update core app HTTP/{update.status_code}: {update.text}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Update core app HTTP/%s: %s", update.status_code, update.text)
         if update.status_code != 200:
             cli.exit(2)
 
-        # Update Access Control Rules
-        self.set_acl(app_moniker, app_config)
+        # Access Control Rules and Directory/Group are separate resources of the app,
+        # the groups are aligned in the background while the rules are updated
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            appgroups_set = executor.submit(self.set_appgroups, app_moniker, app_config)
 
-        # Directory/Group
-        self.set_appgroups(app_moniker, app_config)
+            # Update Access Control Rules
+            self.set_acl(app_moniker, app_config)
 
-    def set_appgroups(self, app_moniker, app_config):
+            appgroups_set.result()
+
+    def set_appgroups(self, app_moniker, app_config, existing_groups=None):
+        """
+        Align the groups allowed to access the application with app_config.
+        :param existing_groups: groups currently associated, fetched from the API if None
+        """
         # TODO: use this method in create_auth to set_auth to better fit both create and update
         # self.create_auth(app_moniker, app_config)
 
@@ -547,32 +731,29 @@ class ApplicationAPI(BaseAPI):
         # {"deleted_objects":["S22ijoezTcmJ70l85O423A"]}
 
         if app_config.get('groups'):  # if the group key is not in the json, we don't touch anything
-            existing_groups_resp = self.get(f'mgmt-pop/apps/{app_moniker.uuid}/groups/', params={'limit': 0})
-            existing_groups = existing_groups_resp.json().get('objects', [])
-            existing_groups_uuid_map = dict()  # mapping between group UUID and app-group UUID association
-            logger.debug(f"existing_groups_resp:\n{json.dumps(existing_groups, indent=2)}")
-            existing_group_uuids = set()
-            for appgroup in existing_groups:
-                scan_dirguuid = appgroup.get('group', {}).get('group_uuid_url')
-                scan_apguuid = appgroup.get('uuid_url')
-                existing_group_uuids.add(scan_dirguuid)
-                existing_groups_uuid_map[scan_dirguuid] = scan_apguuid
-
-            incoming_group_uuids = set()
-            for appgroup in app_config.get('groups', []):
-                incoming_group_uuids.add(appgroup.get('uuid_url'))
-
-            logger.debug(f"existing_appgroup_uuids={existing_group_uuids}")
-            logger.debug(f"incoming_appgroup_uuids={incoming_group_uuids}")
+            if existing_groups is None:
+                existing_groups_resp = self.get(self.app_url(app_moniker, 'groups', ''), params={'limit': 0})
+                existing_groups = self.parse_json(existing_groups_resp).get('objects', [])
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("existing_groups_resp:\n%s", json_pretty(existing_groups))
+            # mapping between group UUID and app-group UUID association
+            existing_groups_uuid_map = {
+                appgroup.get('group', {}).get('group_uuid_url'): appgroup.get('uuid_url')
+                for appgroup in existing_groups
+            }
+            incoming_group_uuids = {appgroup.get('uuid_url') for appgroup in app_config.get('groups', [])}
+
+            logger.debug("existing_appgroup_uuids=%s", set(existing_groups_uuid_map))
+            logger.debug("incoming_appgroup_uuids=%s", incoming_group_uuids)
 
             # Groups to delete
-            delete_payload = {"deleted_objects": []}
-            for group_uuid_to_delete in (existing_group_uuids - incoming_group_uuids):
-                logger.debug(f"Deleting group UUID {group_uuid_to_delete}, "
-                             f"appgroup UUID {existing_groups_uuid_map[group_uuid_to_delete]}...")
-                delete_payload["deleted_objects"].append(existing_groups_uuid_map[group_uuid_to_delete])
-            logger.debug(f"payload: {delete_payload}")
-            self.post('mgmt-pop/appgroups', params={'method': "DELETE"}, json=delete_payload)
+            group_uuids_to_delete = existing_groups_uuid_map.keys() - incoming_group_uuids
+            if group_uuids_to_delete:
+                delete_payload = {"deleted_objects": [
+                    existing_groups_uuid_map[group_uuid] for group_uuid in group_uuids_to_delete
+                ]}
+                logger.debug("payload: %s", delete_payload)
+                self.post('mgmt-pop/appgroups', params={'method': "DELETE"}, json=delete_payload)
 
             # Group to add/ensure are presents
             if len(app_config.get('groups', [])) > 0:
@@ -593,13 +774,14 @@ class ApplicationAPI(BaseAPI):
         # POST on mgmt-pop/apps/DBMcU6FwSjKa7c9sny4RLg/agents
         # Body
         # {"agents":[{"uuid_url":"cht3_GEjQWyMW9LEk7KQfg"}]}
-        logger.info("Attaching {} connectors...".format(len(connectors)))
+        logger.info("Attaching %s connectors...", len(connectors))
         api_resp = self.post(
-            'mgmt-pop/apps/{applicationId}/agents'.format(applicationId=app_moniker.uuid),
+            self.app_url(app_moniker, 'agents'),
             json={'agents': connectors}
         )
-        logger.info("Attach connector response: %s" % api_resp.status_code)
-        logger.info("Attach connector app response: %s" % api_resp.text)
+        logger.info("Attach connector response: %s", api_resp.status_code)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Attach connector app response: %s", api_resp.text)
         if api_resp.status_code not in (200, 201):
             cli.print_error("Connector(s) %s were not attached to application %s [HTTP %s]" %
                             (','.join([c.get('uuid_url') for c in connectors]), app_moniker, api_resp.status_code))
@@ -612,13 +794,14 @@ class ApplicationAPI(BaseAPI):
         Payload is different from attach above:
         {"agents":["cht3_GEjQWyMW9LEk7KQfg"]}
         """
-        logger.info("Detaching {} connectors...".format(len(connectors)))
+        logger.info("Detaching %s connectors...", len(connectors))
         api_resp = self.post(
-            'mgmt-pop/apps/{applicationId}/agents'.format(applicationId=app_moniker.uuid),
+            self.app_url(app_moniker, 'agents'),
             params={'method': 'delete'}, json={'agents': [c.get('uuid_url') for c in connectors]}
         )
-        logger.info("Detach connector response: %s" % api_resp.status_code)
-        logger.info("Detach connector app response: %s" % api_resp.text)
+        logger.info("Detach connector response: %s", api_resp.status_code)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Detach connector app response: %s", api_resp.text)
         if api_resp.status_code not in (200, 204):
             cli.print_error("Connector(s) %s were not detached from application %s [HTTP %s]" %
                             (','.join([c.get('uuid_url') for c in connectors]), app_moniker, api_resp.status_code))
@@ -626,15 +809,57 @@ class ApplicationAPI(BaseAPI):
             cli.exit(2)
 
     def add_dnsexception(self, app_moniker):
-        logger.info("Adding DNS exception: %s" % config.exception_fqdn)
-        appcfg = self.load(app_moniker)
-        dns_exceptions = set(appcfg.get('advanced_settings', {}).get('domain_exception_list').split(','))
-        dns_exceptions |= set(config.exception_fqdn)
-        appcfg["advanced_settings"]["domain_exception_list"] = ','.join(dns_exceptions)
-        self.save(app_moniker, appcfg)
+        logger.info("Adding DNS exception: %s", config.exception_fqdn)
+        self.update_dnsexceptions(app_moniker, add=config.exception_fqdn)
 
     def del_dnsexception(self, app_moniker):
-        logger.info("Remove DNS exception: %s" % config.exception_fqdn)
+        logger.info("Remove DNS exception: %s", config.exception_fqdn)
+        self.update_dnsexceptions(app_moniker, remove=config.exception_fqdn)
+
+    @staticmethod
+    def dns_exceptions(app_config):
+        """
+        DNS exceptions of an application configuration,
+        stripped and without duplicates, in the order they are stored.
+        """
+        stored = (app_config.get('advanced_settings') or {}).get('domain_exception_list') or ''
+        return list(dict.fromkeys(fqdn for fqdn in map(str.strip, stored.split(',')) if fqdn))
+
+    def update_dnsexceptions(self, app_moniker, add=(), remove=()):
+        """
+        Add and/or remove DNS exceptions of a tunnel-type client-app.
+        All the FQDNs are applied with one GET and at most one PUT on the application.
+        """
+        # The advanced settings are all we need, and we PUT back the app core configuration
+        appcfg = self.load(app_moniker, include_groups=False, include_urllocation=False)
+        advanced_settings = appcfg.setdefault('advanced_settings', {})
+        existing = self.dns_exceptions(appcfg)
+        # Ordered dedup, keep the existing entries where they are
+        dns_exceptions = dict.fromkeys(chain(existing, (fqdn for fqdn in map(str.strip, add) if fqdn)))
+        for fqdn in remove:
+            dns_exceptions.pop(fqdn.strip(), None)
+        # Compared once normalized, a list stored with spaces or duplicates is not rewritten as is
+        if list(dns_exceptions) == existing:
+            logger.info("DNS exception list of %s unchanged, nothing to update", app_moniker)
+            return
+        advanced_settings["domain_exception_list"] = ','.join(dns_exceptions)
+        # Optimistic concurrency, do not overwrite a change made since our GET
+        etag = self._etags.get(app_moniker.uuid)
+        update = self.put(self.app_url(app_moniker), json=appcfg, headers={'If-Match': etag} if etag else None)
+        if update.status_code == 412:
+            # The application changed since our GET, possibly with this very update
+            # if the PUT went through but its response was lost on the way back
+            current = self.load(app_moniker, include_groups=False, include_urllocation=False)
+            if self.dns_exceptions(current) == list(dns_exceptions):
+                logger.info("DNS exception list of %s already up to date", app_moniker)
+                return
+            cli.print_error("Application %s was modified while updating its DNS exception list, "
+                            "please try again" % app_moniker)
+            cli.exit(2)
+        if update.status_code != 200:
+            cli.print_error("DNS exception list of application %s not updated [HTTP %s]" %
+                            (app_moniker, update.status_code))
+            cli.exit(2)
 
     def deploy(self, app_moniker, comment=""):
         """
@@ -647,8 +872,8 @@ class ApplicationAPI(BaseAPI):
         payload = {}
         if comment:
             payload["deploy_note"] = comment
-        deploy = self.post('mgmt-pop/apps/{applicationId}/deploy'.format(applicationId=app_moniker.uuid), json=payload)
-        logger.info("ApplicationAPI: deploy app response: %s" % deploy.status_code)
+        deploy = self.post(self.app_url(app_moniker, 'deploy'), json=payload)
+        logger.info("ApplicationAPI: deploy app response: %s", deploy.status_code)
         if deploy.status_code != 200:
             logger.error(deploy.text)
 
@@ -662,25 +887,28 @@ class ApplicationAPI(BaseAPI):
             raise Exception("Unsupported API version")
         
         app_fields = set(["uuid_url"] + fields)
-
-        total_count = None
-        page = 1
         page_size = 100
-        offset = 0
-        l = []
-
-        app_config_loader = ApplicationAPI(self._config, BaseAPI.API_Version.OpenAPI)
-        while total_count == None or len(l) < total_count:
-            r = self.get('mgmt-pop/apps', params={"offset": offset, "fields": ",".join(app_fields), 
-                                                  "limit": page_size, "offset": (page-1)*page_size})
-            j = r.json()
-            total_count = j.get('meta').get('total_count')
-            page += 1
-            for a in j.get('objects'):
-                if details:
-                    l.append(app_config_loader.load(EAAItem(f"app://{a.get('uuid_url')}"), expand=False))
-                else:
-                    l.append(a)
+        url_params = {"fields": ",".join(app_fields), "limit": page_size}
+
+        def fetch_page(offset):
+            r = self.get('mgmt-pop/apps', params=dict(url_params, offset=offset))
+            return self.parse_json(r).get('objects') or []
+
+        # The first page tells how many apps there are, the other pages are
+        # then fetched concurrently, and kept in order
+        r = self.get('mgmt-pop/apps', params=dict(url_params, offset=0))
+        j = self.parse_json(r)
+        total_count = j.get('meta').get('total_count') or 0
+        l = j.get('objects') or []
+
+        with ThreadPoolExecutor(max_workers=self._config.concurrency) as executor:
+            for page in executor.map(fetch_page, range(page_size, total_count, page_size)):
+                l.extend(page)
+            if details:
+                app_config_loader = ApplicationAPI(self._config, BaseAPI.API_Version.OpenAPI)
+                app_monikers = [EAAItem.from_uuid(EAAItem.Type.Application, a.get('uuid_url')) for a in l]
+                l = list(executor.map(lambda app_moniker: app_config_loader.load(app_moniker, expand=False),
+                                      app_monikers))
         return l
 
     def stats_by_cloudzone(self):
@@ -699,7 +927,7 @@ class ApplicationAPI(BaseAPI):
         "Special app 'Enterprise DNS'."
         entdns_count_by_cloudzone = {}
         r = self.get("mgmt-pop/childdns?limit=0")
-        entdns_response = r.json()
+        entdns_response = self.parse_json(r)
         for e in entdns_response.get('objects'):
             scanned_cloudzone = e.get('popRegion')
             if scanned_cloudzone not in entdns_count_by_cloudzone.keys():
@@ -14,15 +14,17 @@
 
 from enum import Enum
 import logging
-import json
+from concurrent.futures import ThreadPoolExecutor
 
 from cryptography import x509
 from cryptography.hazmat.backends import default_backend
 
-from common import cli, BaseAPI, EAAItem, config
+from common import cli, BaseAPI, EAAItem, config, json_pretty
 from application import ApplicationAPI
 from idp import IdentityProviderAPI
 
+logger = logging.getLogger(__name__)
+
 
 class CertificateAPI(BaseAPI):
     """
@@ -40,6 +42,9 @@ class CertificateAPI(BaseAPI):
 
     def __init__(self, config):
         super(CertificateAPI, self).__init__(config, api=BaseAPI.API_Version.OpenAPI)
+        #: Applications and identity providers of the tenant, see _list_apps()
+        self._apps = None
+        self._idps = None
 
     def cert_hosts(self, cert):
         "Extract CN and SAN hostname from certificate."
@@ -58,21 +63,17 @@ class CertificateAPI(BaseAPI):
     def list(self):
         url_params = {'expand': 'true', 'limit': 0}
         data = self.get('mgmt-pop/certificates', params=url_params)
-        certificates = data.json()
+        certificates = self.parse_json(data)
         total_cert = 0
-        logging.info(json.dumps(data.json(), indent=4))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json_pretty(certificates))
         cli.print('#Certificate-ID,cn,type,expiration,days left,hosts')
-        format_line = "{scheme}{uuid},{cn},{cert_type},{expiration},{days_left},{hosts}"
+        scheme = EAAItem.Type.Certificate.scheme
         for total_cert, c in enumerate(certificates.get('objects', {}), start=1):
-            cli.print(format_line.format(
-                scheme=EAAItem.Type.Certificate.scheme,
-                uuid=c.get('uuid_url'),
-                cn=c.get('cn'),
-                cert_type=CertificateAPI.Type(c.get('cert_type')).name,
-                expiration=c.get('expired_at'),
-                days_left=c.get('days_left'),
-                hosts='+'.join(self.cert_hosts(c.get('cert')))
-            ))
+            cert_type = _CERT_TYPES[c.get('cert_type')].name
+            hosts = '+'.join(self.cert_hosts(c.get('cert')))
+            cli.print(f"{scheme}{c.get('uuid_url')},{c.get('cn')},{cert_type},"
+                      f"{c.get('expired_at')},{c.get('days_left')},{hosts}")
         cli.footer("Total %s certificate(s)" % total_cert)
 
     def rotate(self):
@@ -81,25 +82,30 @@ class CertificateAPI(BaseAPI):
         """
         cert_moniker = EAAItem(self._config.certificate_id)
         cli.print("Rotating certificate %s..." % cert_moniker.uuid)
-        api_url = 'mgmt-pop/certificates/{certificate_id}'.format(certificate_id=cert_moniker.uuid)
+        api_url = f'mgmt-pop/certificates/{cert_moniker.uuid}'
 
-        get_resp = self.get(api_url)
-        current_cert = get_resp.json()
+        payload = {}
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # Read the new certificate and key while the current one is being fetched
+            get_resp = executor.submit(self.get, api_url)
+            # PEM is ASCII, the API expects it as text in the JSON payload
+            with open(self._config.cert) as f:
+                payload['cert'] = f.read()
+            with open(self._config.key) as f:
+                payload['private_key'] = f.read()
+            current_cert = self.parse_json(get_resp.result())
         # cli.print(json.dumps(current_cert, sort_keys=True, indent=4))
 
-        payload = {}
         payload['name'] = current_cert.get('name')
         cli.print("Certificate CN: %s (%s)" % (current_cert.get('cn'), payload['name']))
         payload['cert_type'] = current_cert.get('cert_type')
-        with self._config.cert as f:
-            payload['cert'] = f.read()
-        with self._config.key as f:
-            payload['private_key'] = f.read()
         if self._config.passphrase:
             payload['password'] = self._config.passphrase
         put_resp = self.put(api_url, json=payload, params={'expand': 'true', 'limit': 0})
         if put_resp.status_code == 200:
-            new_cert = put_resp.json()
+            # The rotation changed the status of the apps/IdPs using the certificate
+            self._apps = self._idps = None
+            new_cert = self.parse_json(put_resp)
             cli.footer(("Certificate %s updated, %s application/IdP(s) "
                         "have been marked ready for deployment.") %
                        (cert_moniker.uuid, new_cert.get('app_count')))
@@ -119,52 +125,88 @@ class CertificateAPI(BaseAPI):
         cert_moniker = EAAItem(self._config.certificate_id)
         cli.header("#App/IdP ID,name,status")
         app_api = ApplicationAPI(config)
-        for app_id, app_name in self.findappsbycert(cert_moniker.uuid):
-            # We don't need much info so expand=False to keep it quick
-            app_config = app_api.load(app_id, expand=False)
-#            cli.print(app_config)
-            app_status = ApplicationAPI.Status(app_config.get('app_status'))
-            cli.print("%s,%s,%s" % (app_id, app_name, app_status.name))
-
         idp_api = IdentityProviderAPI(config)
-        for idp_id, idp_name in self.findidpbycert(cert_moniker.uuid):
-            idp_config = idp_api.load(idp_id)
-            idp_status = ApplicationAPI.Status(idp_config.get('idp_status'))
-            cli.print("%s,%s,%s" % (idp_id, idp_name, idp_status.name))
+        with ThreadPoolExecutor(max_workers=config.concurrency) as executor:
+            idps = executor.submit(lambda: list(self.findidpbycert(cert_moniker.uuid)))
+            apps = list(self.findappsbycert(cert_moniker.uuid))
+            # We don't need much info so expand=False to keep it quick
+            app_configs = executor.map(lambda app: app_api.load(app[0], expand=False), apps)
+            for (app_id, app_name), app_config in zip(apps, app_configs):
+                app_status = ApplicationAPI.Status(app_config.get('app_status'))
+                cli.print("%s,%s,%s" % (app_id, app_name, app_status.name))
+
+            idps = idps.result()
+            idp_configs = executor.map(lambda idp: idp_api.load(idp[0]), idps)
+            for (idp_id, idp_name), idp_config in zip(idps, idp_configs):
+                idp_status = ApplicationAPI.Status(idp_config.get('idp_status'))
+                cli.print("%s,%s,%s" % (idp_id, idp_name, idp_status.name))
+
+    def _list_apps(self):
+        """
+        All applications of the tenant, `status` and `deployafter` both
+        scan them so we only fetch them once.
+        """
+        if self._apps is None:
+            # Only the fields we filter and display on, not the whole app inventory
+            app_api = ApplicationAPI(self._config, BaseAPI.API_Version.OpenAPIv3)
+            apps = app_api.list(fields=['name', 'cert'])
+            # Without the field, no application would ever match the certificate
+            if apps and not any('cert' in a for a in apps):
+                cli.print_error("The application list has no cert field, "
+                                "cannot tell which applications use the certificate")
+                cli.exit(2)
+            self._apps = apps
+        return self._apps
+
+    def _list_idps(self):
+        "All identity providers of the tenant, see _list_apps()."
+        if self._idps is None:
+            url_params = {'limit': 10000}
+            search_idp = self.get('mgmt-pop/idp', params=url_params)
+            self._idps = self.parse_json(search_idp).get('objects', [])
+        return self._idps
 
     def findappsbycert(self, certid):
         """Find application using certificate identified by `certid`"""
-        url_params = {'limit': 10000}
-        search_app = self.get('mgmt-pop/apps', params=url_params)
-        apps = search_app.json()
-        for a in apps.get('objects', []):
+        for a in self._list_apps():
             if a.get('cert') == certid:
-                yield (EAAItem("app://%s" % a.get('uuid_url')), a.get('name'))
+                yield (EAAItem.from_uuid(EAAItem.Type.Application, a.get('uuid_url')), a.get('name'))
 
     def findidpbycert(self, certid):
         """Find IdP using certificate identified by `certid`"""
-        url_params = {'limit': 10000}
-        search_idp = self.get('mgmt-pop/idp', params=url_params)
-        idps = search_idp.json()
-        for i in idps.get('objects', []):
+        for i in self._list_idps():
             if i.get('cert') == certid:
-                yield (EAAItem("idp://%s" % i.get('uuid_url')), i.get('name'))
+                yield (EAAItem.from_uuid(EAAItem.Type.IdentityProvider, i.get('uuid_url')), i.get('name'))
 
     def deployafter(self, certid):
         """
         Trigger deployment request of all Apps and IdP using the certificate.
         """
         app_api = ApplicationAPI(config)
-        for app_id, app_name in self.findappsbycert(certid):
+        idp_api = IdentityProviderAPI(config)
+
+        def deploy_app(app):
+            app_id, app_name = app
             cli.print("Deploying application %s (%s)..." % (app_name, app_id))
             app_api.deploy(app_id)
-        idp_api = IdentityProviderAPI(config)
-        for idp_id, idp_name in self.findidpbycert(certid):
+
+        def deploy_idp(idp):
+            idp_id, idp_name = idp
             cli.print("Deploying IdP %s (%s)..." % (idp_name, idp_id))
             idp_api.deploy(idp_id)
+
+        # Deployment requests are independent from each other
+        with ThreadPoolExecutor(max_workers=config.concurrency) as executor:
+            idps = executor.submit(lambda: list(self.findidpbycert(certid)))
+            list(executor.map(deploy_app, self.findappsbycert(certid)))
+            list(executor.map(deploy_idp, idps.result()))
         cli.print("Deployment(s) in progress, it typically take 3 to 5 minutes")
         cli.print("Use 'akamai eaa cert crt://%s status' to monitor the progress." % certid)
 
     def delete(self):
         raise NotImplementedError("deletion not implemented")
         pass
+
+
+# Certificate types keyed by their API value, see CertificateAPI.list()
+_CERT_TYPES = {t.value: t for t in CertificateAPI.Type}
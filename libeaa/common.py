@@ -20,7 +20,8 @@ Common class / function for cli-eaa
 __version__ = '0.6.11'
 
 import sys
-from threading import Event
+import json
+from threading import Event, Lock
 import logging
 import base64
 import hmac
@@ -29,10 +30,21 @@ from urllib.parse import urljoin, parse_qs
 from enum import Enum, IntEnum
 
 # 3rd party libs
-import six
 import requests
 from config import EdgeGridConfig
 from akamai.edgegrid import EdgeGridAuth, EdgeRc
+try:  # Optional, faster JSON decoder
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+try:  # Same for the indented JSON of the diagnostic logs
+    from orjson import dumps as _orjson_dumps, OPT_INDENT_2
+
+    def json_pretty(obj):
+        return _orjson_dumps(obj, option=OPT_INDENT_2).decode()
+except ImportError:
+    def json_pretty(obj):
+        return json.dumps(obj, indent=2)
 
 
 # If all parameters are set already, use them.  Otherwise
@@ -56,6 +68,18 @@ class cli:
         sys.stdout.write("%s\n" % s)
         sys.stdout.flush()
 
+    @staticmethod
+    def print_json(obj, flush=True, **kwargs):
+        """
+        Serialize obj to stdout in a single write.
+        Use flush=False when printing many documents in a row and flush once at the end.
+        """
+        # json.dumps uses the C encoder, json.dump falls back to the pure Python
+        # one to write the document chunk by chunk
+        sys.stdout.write(json.dumps(obj, **kwargs) + "\n")
+        if flush:
+            sys.stdout.flush()
+
     @staticmethod
     def print_error(s):
         sys.stderr.write("%s\n" % s)
@@ -154,10 +178,14 @@ class EAAItem(object):
 
         @classmethod
         def has_value(cls, value):
-            return value in [m[1].value for m in cls.__members__.items()]
+            try:
+                cls(value)
+            except ValueError:
+                return False
+            return True
 
     def __init__(self, obj_url):
-        if not isinstance(obj_url, six.string_types):
+        if not isinstance(obj_url, str):
             raise TypeError('obj_url must be a string')
         if EAAItem._SEP not in obj_url:
             raise EAAInvalidMoniker('Invalid EAA Object URL %s' % obj_url)
@@ -168,6 +196,17 @@ class EAAItem(object):
             raise ValueError('Invalid type "%s"' % scanned_type)
         self.uuid = scanned_uuid
 
+    @classmethod
+    def from_uuid(cls, objtype, uuid):
+        """
+        Build the item from its type and UUID as returned by the API,
+        without assembling and parsing the object URL again.
+        """
+        item = cls.__new__(cls)
+        item.objtype = objtype
+        item.uuid = uuid
+        return item
+
     def __repr__(self):
         return self.objtype.scheme + self.uuid
 
@@ -192,6 +231,10 @@ class BaseAPI(object):
         OpenAPI = 2,
         OpenAPIv3 = 3
 
+    #: Sessions shared by all the API objects of the process, see session()
+    _sessions = {}
+    _sessions_lock = Lock()
+
     def __init__(self, config=None, api=API_Version.Legacy):
 
         self._config = config
@@ -199,6 +242,13 @@ class BaseAPI(object):
         section = config.section
         self.extra_qs = {}
         self.api_ver = api
+        #: Sent with every request, built once from the configuration
+        self._user_agent = f"{config.ua_prefix} cli-eaa/{__version__}"
+        self._base_params = {"ua": self._user_agent}
+        if getattr(config, 'contract_id', None):
+            self._base_params['contractId'] = config.contract_id
+        if getattr(config, 'accountkey', None):
+            self._base_params['accountSwitchKey'] = config.accountkey
 
         if self.api_ver == self.API_Version.Legacy:  # Prior to {OPEN} API, used for SIEM API only
             self._content_type_json = {'content-type': 'application/json'}
@@ -208,33 +258,73 @@ class BaseAPI(object):
             # self._baseurl = 'https://%s' % edgerc.get(section, 'host')
             self._baseurl = 'https://%s/api/v1/' % edgerc.get(section, 'eaa_api_host',
                                                               fallback="manage.akamai-access.com")
-            self._session = requests.Session()
-            self._session.auth = EAALegacyAuth(
-                edgerc.get(section, 'eaa_api_key'),
-                edgerc.get(section, 'eaa_api_secret')
-            )
-            siem_api_adapter = requests.adapters.HTTPAdapter(
-                max_retries=requests.adapters.Retry(total=5, backoff_factor=1, allowed_methods=["GET", "POST"])
-            )
-            self._session.mount("https://", siem_api_adapter)
         else:  # EAA {OPEN} API
             if self.api_ver == self.API_Version.OpenAPI:
                 self._baseurl = f'https://%s/crux/v1/' % edgerc.get(section, 'host')
             elif self.api_ver == self.API_Version.OpenAPIv3:
                 self._baseurl = f'https://%s/crux/v3/' % edgerc.get(section, 'host')
-            self._session = requests.Session()
-            self._session.auth = EdgeGridAuth.from_edgerc(edgerc, section)
 
-        if self._session:
-            self._session.headers.update({'User-Agent': self.user_agent()})
-            if config.proxy:
-                logger.info("Set proxy to %s" % config.proxy)
-                self._session.proxies['https'] = 'http://%s' % config.proxy
+        self._session = self.session(edgerc, section)
+
+        logger.info("Initialized with base_url %s", self._baseurl)
+
+    def session(self, edgerc, section):
+        """
+        Return the Requests session for this API backend.
+        The commands instantiate several API objects, they all share the same session
+        (hence the same pool of TCP+TLS connections) as long as they use the same
+        credentials. {OPEN} API v1 and v3 are served by the same host.
+        """
+        legacy = self.api_ver == self.API_Version.Legacy
+        key = (self._config.edgerc, section, legacy)
+        with BaseAPI._sessions_lock:
+            session = BaseAPI._sessions.get(key)
+            if session is None:
+                session = BaseAPI._sessions[key] = self.new_session(edgerc, section, legacy)
+        return session
+
+    def new_session(self, edgerc, section, legacy):
+        session = requests.Session()
+        if legacy:
+            session.auth = EAALegacyAuth(
+                edgerc.get(section, 'eaa_api_key'),
+                edgerc.get(section, 'eaa_api_secret')
+            )
+            # Single host, at most two requests in flight: the event log page being
+            # processed and the next one, prefetched in the background
+            siem_api_adapter = requests.adapters.HTTPAdapter(
+                pool_connections=1, pool_maxsize=2,
+                max_retries=requests.adapters.Retry(total=5, backoff_factor=1, allowed_methods=["GET", "POST"])
+            )
+            session.mount("https://", siem_api_adapter)
+        else:
+            session.auth = EdgeGridAuth.from_edgerc(edgerc, section)
+            # Keep the TCP+TLS connections alive across the mgmt-pop calls,
+            # one per request we may send in parallel (--concurrency).
+            # Extra threads wait for a pooled connection rather than opening
+            # a new one that would be thrown away after a single request.
+            open_api_adapter = requests.adapters.HTTPAdapter(
+                pool_connections=1, pool_maxsize=self._config.concurrency, pool_block=True,
+                # Once the retries are exhausted, the last response is returned
+                # to the caller's own status code handling rather than raised.
+                # Only the read-only methods are resent: a write may have been
+                # applied before its response got lost, e.g. a DELETE retried
+                # after a 502 would answer 404, a conditional PUT 412.
+                max_retries=requests.adapters.Retry(total=3, backoff_factor=0.5,
+                                                    status_forcelist=(429, 502, 503, 504),
+                                                    allowed_methods=frozenset(('GET', 'HEAD', 'OPTIONS')),
+                                                    raise_on_status=False)
+            )
+            session.mount("https://", open_api_adapter)
 
-        logger.info("Initialized with base_url %s" % self._baseurl)
+        session.headers.update({'User-Agent': self.user_agent()})
+        if self._config.proxy:
+            logger.info("Set proxy to %s", self._config.proxy)
+            session.proxies['https'] = 'http://%s' % self._config.proxy
+        return session
 
     def user_agent(self):
-        return f"{self._config.ua_prefix} cli-eaa/{__version__}"
+        return self._user_agent
 
     def build_params(self, params=None):
         """
@@ -242,12 +332,7 @@ class BaseAPI(object):
 
         Return a dictionnary Requests can consume as `params` argument
         """
-        final_params = {"ua": self.user_agent()}
-        final_params.update(self.extra_qs)
-        if hasattr(self._config, 'contract_id') and self._config.contract_id:
-            final_params.update({'contractId': self._config.contract_id})
-        if hasattr(self._config, 'accountkey') and self._config.accountkey:
-            final_params.update({'accountSwitchKey': self._config.accountkey})
+        final_params = dict(self._base_params, **self.extra_qs)
         if isinstance(params, dict):
             final_params.update(params)
         return final_params
@@ -257,51 +342,67 @@ class BaseAPI(object):
         """
         Log information about the API request/response to help with troubleshooting.
         """
-        logger.info(f"BaseAPI: {response.url} {response.request.method} response is HTTP/{response.status_code}, "
-                     f"x-trace-id: {response.headers.get('x-trace-id')}, "
-                     f"x-ids-session-id: {response.headers.get('x-ids-session-id')}")
+        logger.info("BaseAPI: %s %s response is HTTP/%s, x-trace-id: %s, x-ids-session-id: %s",
+                    response.url, response.request.method, response.status_code,
+                    response.headers.get('x-trace-id'), response.headers.get('x-ids-session-id'))
 
-    def get(self, url_path, params=None):
+    @staticmethod
+    def log_response_body(response):
         """
-        Send a GET reques to the API.
+        Log the response body, it is only decoded when the INFO level is enabled.
+        """
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("BaseAPI: %s response body: %s", response.request.method, response.text)
+
+    @staticmethod
+    def parse_json(response):
+        """
+        Decode the JSON body of an API response, like response.json()
+        but with orjson when it is installed.
+        """
+        return json_loads(response.content)
+
+    def _request(self, method, url_path, params=None, **kwargs):
+        """
+        Send a request to the API on the pooled session of the backend.
+        All the HTTP verbs below share this path, only their response handling differ.
         """
         url = urljoin(self._baseurl, url_path)
-        response = self._session.get(url, params=self.build_params(params), timeout=HTTP_REQ_TIMEOUT)
+        logger.info("[%s] API URL: %s", method, url)
+        response = self._session.request(method, url, params=self.build_params(params),
+                                         timeout=HTTP_REQ_TIMEOUT, **kwargs)
         BaseAPI.log_response_summary(response)
+        return response
+
+    def get(self, url_path, params=None):
+        """
+        Send a GET reques to the API.
+        """
+        response = self._request('GET', url_path, params=params)
         if response.status_code == 401:
             logger.fatal(f"API returned HTTP/401, check your API credentials\n{response.text}")
             logger.fatal(f"EdgeRC Section: {config.section}")
             cli.exit(401)
         if response.status_code != requests.status_codes.codes.ok:
-            logger.info("BaseAPI: GET response body: %s" % response.text)
+            BaseAPI.log_response_body(response)
         return response
 
     def post(self, url_path, json=None, params=None, allow_redirects=True):
-        url = urljoin(self._baseurl, url_path)
-        logger.info("API URL: %s" % url)
-        response = self._session.post(url, json=json, params=self.build_params(params),
-                                      timeout=HTTP_REQ_TIMEOUT, allow_redirects=allow_redirects)
-        BaseAPI.log_response_summary(response)
+        response = self._request('POST', url_path, params=params, json=json, allow_redirects=allow_redirects)
         if response.status_code != 200:
-            logger.info("BaseAPI: POST response body: %s" % response.text)
+            BaseAPI.log_response_body(response)
         return response
 
-    def put(self, url_path, json=None, params=None):
-        url = urljoin(self._baseurl, url_path)
-        logger.info("[PUT] API URL: %s" % url)
-        response = self._session.put(url, json=json, params=self.build_params(params), timeout=HTTP_REQ_TIMEOUT)
-        BaseAPI.log_response_summary(response)
+    def put(self, url_path, json=None, params=None, headers=None):
+        response = self._request('PUT', url_path, params=params, json=json, headers=headers)
         if response.status_code != 200:
-            logger.info("BaseAPI: PUT response body: %s" % response.text)
+            BaseAPI.log_response_body(response)
         return response
 
     def delete(self, url_path, json=None, params=None):
-        url = urljoin(self._baseurl, url_path)
-        logger.info("API URL: %s" % url)
-        response = self._session.delete(url, json=json, params=self.build_params(params), timeout=HTTP_REQ_TIMEOUT)
-        BaseAPI.log_response_summary(response)
+        response = self._request('DELETE', url_path, params=params, json=json)
         if response.status_code != 200:
-            logger.info("BaseAPI: DELETE response body: %s" % response.text)
+            BaseAPI.log_response_body(response)
         return response
 
 
@@ -327,8 +428,9 @@ def merge_dicts(dict1, dict2):
     merged_dict = dict1.copy()
 
     for key, value in dict2.items():
-        if key in merged_dict and isinstance(merged_dict[key], dict) and isinstance(value, dict):
-            merged_dict[key] = merge_dicts(merged_dict[key], value)
+        current = merged_dict.get(key)
+        if isinstance(value, dict) and isinstance(current, dict):
+            merged_dict[key] = merge_dicts(current, value)
         else:
             merged_dict[key] = value
 
@@ -13,12 +13,12 @@
 # limitations under the License.
 
 import logging
-from multiprocessing import Pool
+from concurrent.futures import ThreadPoolExecutor
 import time
 import json
-import signal
 import datetime
 from functools import lru_cache
+from itertools import chain, repeat
 import io
 import csv
 from dateutil.parser import parse
@@ -33,9 +33,10 @@ class ConnectorAPI(BaseAPI):
     """
     Handle interactions with EAA Connector API
     """
-    POOL_SIZE = 6        # When doing sub request, max concurrency of underlying HTTP request
     LIMIT_SOFT = 1024    # Soft limit of maximum of connectors to retreive at once
     APP_CACHE_TTL = 300  # How long we consider the app <-> connector mapping accurate enough
+    CON_CACHE_TTL = 30   # How long we consider the list of connectors accurate enough
+    APP_PAGE_SIZE = 500  # Applications fetched per request, see app_pages()
     NODATA = "-"         # Output value in the CSV cell if data is not available
     NODATA_JSON = None   # Output value in the JSON cell if data is not available
 
@@ -55,24 +56,41 @@ class ConnectorAPI(BaseAPI):
     def __init__(self, config):
         super(ConnectorAPI, self).__init__(config, api=BaseAPI.API_Version.OpenAPI)
 
-    def load(self, con_moniker: EAAItem):
+    @staticmethod
+    def _nd(value, nodata=NODATA):
+        "Value or `nodata` placeholder if the API didn't return it, 0 is a valid metric."
+        return nodata if value is None else value
+
+    def load(self, con_moniker: EAAItem, cached=True):
         """
         Load a connector config
 
         Args:
             con_moniker (EAAItem): Connector identifier (e.g. con://123456)
+            cached (bool): Accept a connector list up to CON_CACHE_TTL seconds old
 
         Returns:
             bool/dict: False if connector doesn't exist
                        The full dictionnary configuration of the connector if found
         """
+        now = time.time()
+        exp = now - now % (-1 * ConnectorAPI.CON_CACHE_TTL) if cached else now
+        return self.connectors_by_uuid(exp).get(con_moniker.uuid, False)
+
+    @lru_cache(maxsize=1)
+    def connectors_by_uuid(self, exp):
+        """
+        Fetch all the connectors of the tenant, cached like `all_apps`
+        with `exp` as expiration or cache key.
+
+        Args:
+            exp (number): cache key
+        Returns:
+            dict: connector configuration (not expanded) by connector UUID
+        """
         url_params = {'expand': 'false', 'limit': ConnectorAPI.LIMIT_SOFT}
         data = self.get('mgmt-pop/agents', params=url_params)
-        connectors = data.json()
-        for c in connectors.get('objects', []):
-            if c.get('uuid_url') == con_moniker.uuid:
-                return c
-        return False
+        return {c.get('uuid_url'): c for c in self.parse_json(data).get('objects', [])}
 
     def perf_system(self, connector_id):
         """
@@ -85,9 +103,9 @@ class ConnectorAPI(BaseAPI):
             [tuple]: (connector_id, dictionnary with metric name as key)
         """
         try:  # This method is executed as separate thread, we need the able to troubleshoot
-            systemres_api_url = 'mgmt-pop/agents/{agentid}/system_resource/metrics'.format(agentid=connector_id)
+            systemres_api_url = f'mgmt-pop/agents/{connector_id}/system_resource/metrics'
             perf_data_resp = self.get(systemres_api_url, params={'period': '1h'})
-            perf_data = perf_data_resp.json()
+            perf_data = self.parse_json(perf_data_resp)
             perf_latest = {
                 'timestamp': None,
                 'mem_pct': None, 'disk_pct': None, 'cpu_pct': None,
@@ -99,6 +117,7 @@ class ConnectorAPI(BaseAPI):
             return (connector_id, perf_latest)
         except Exception:
             logging.exception("Error during fetching connector performance health.")
+            return (connector_id, {})
 
     def perf_apps(self, connector_id):
         """
@@ -107,11 +126,11 @@ class ConnectorAPI(BaseAPI):
         Args:
             connector_id (string): Connector UUID without prefix
         """
-        perfapp_api_url = 'mgmt-pop/agents/{agentid}/apps_resource/metrics'.format(agentid=connector_id)
+        perfapp_api_url = f'mgmt-pop/agents/{connector_id}/apps_resource/metrics'
         perf_data_resp = self.get(perfapp_api_url, params={'period': '1h', 'filter_all': 'false'})
         perf_by_host = {}
         if perf_data_resp.status_code == 200:
-            for perf_by_app in perf_data_resp.json().get('data', []):
+            for perf_by_app in self.parse_json(perf_data_resp).get('data', []):
                 perf_by_host[perf_by_app.get('app_name')] = {}
                 if len(perf_by_app.get('histogram_data', [])[-1]) >= 1:
                     perf_by_host[perf_by_app.get('app_name')] = perf_by_app.get('histogram_data')[-1]
@@ -122,92 +141,94 @@ class ConnectorAPI(BaseAPI):
         Display the list of EAA connectors as comma separated CSV or JSON
         TODO: refactor this method, too long
         """
-        url_params = {'expand': 'true', 'limit': ConnectorAPI.LIMIT_SOFT}
+        # The columns are all plain attributes of the connector, like in load()
+        # we don't need the related objects expanded
+        url_params = {'expand': 'false', 'limit': ConnectorAPI.LIMIT_SOFT}
         data = self.get('mgmt-pop/agents', params=url_params)
         if data.status_code != 200:
             cli.print_error(f"API Error HTTP/{data.status_code} for {data.url}")
             cli.exit(2)
 
-        dt = datetime.datetime.now(tz=datetime.timezone.utc)
-        connectors = data.json()
-        total_con = 0
+        dt = datetime.datetime.now(tz=datetime.timezone.utc).isoformat()
+        connectors = self.parse_json(data).get('objects', [])
+        connector_ids = [c.get('uuid_url') for c in connectors]
         header = '#Connector-id,name,reachable,status,version,privateip,publicip,debug'
-        format_line = "{scheme}{con_id},{name},{reachable},{status},{version},{privateip},{publicip},{debugchan}"
         if perf:
             header += ",last_upd,CPU%,Mem%,Disk%,NetworkMbps,do_total,do_idle,do_active"
-            format_line += ",{ts},{cpu},{mem},{disk},{network},{dialout_total},{dialout_idle},{dialout_active}"
-            # Add performance metrics in the report
-            perf_res_list = None
-            signal.signal(signal.SIGTERM, signal.SIG_DFL)
-            with Pool(ConnectorAPI.POOL_SIZE) as p:
-                perf_res_list = p.map(self.perf_system, [c.get('uuid_url') for c in connectors.get('objects', [])])
-            perf_res = dict(perf_res_list)
-            signal.signal(signal.SIGTERM, cli.exit_gracefully)
+            # Order of the metrics in the CSV columns
+            perf_columns = ('ts', 'cpu', 'mem', 'disk', 'network', 'dialout_total', 'dialout_idle', 'dialout_active')
 
         if not json_fmt:
             cli.header(header)
-        perf_latest = {}
-        for total_con, c in enumerate(connectors.get('objects', []), start=1):
+        scheme = EAAItem.Type.Connector.scheme
+        perf_values = {}
+        rows = []
+        # Without --perf the rows are complete right away and written at once,
+        # with --perf each row is written as soon as the metrics of its connector are in
+        write_row = cli.print if perf else rows.append
+        # I/O bound, threads share the session and its pooled connections (--concurrency)
+        # No thread is started without --perf, nothing is submitted
+        workers = max(1, min(self._config.concurrency, len(connector_ids)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
             if perf:
-                perf_latest = perf_res.get(c.get('uuid_url'), {})
-
-            agent_version = c.get('agent_version') or ConnectorAPI.NODATA_JSON
-            if agent_version:
-                agent_version = agent_version.replace('AGENT-', '').strip()
-
-            data = {
-                "connector_uuid": c.get('uuid_url'),
-                "name": c.get('name'),
-                "reachable": c.get('reach'),
-                "status": c.get('status'),
-                "version": agent_version,
-                "privateip": c.get('private_ip') or ConnectorAPI.NODATA_JSON,
-                "publicip": c.get('public_ip') or ConnectorAPI.NODATA_JSON,
-                "debugchan": 'Y' if c.get('debug_channel_permitted') else 'N',
-                "os_version": c.get('os_version') or ConnectorAPI.NODATA_JSON,
-                "datetime": dt.isoformat()
-            }
-            if perf:
-                data.update({
-                    "ts": perf_latest.get('timestamp') or ConnectorAPI.NODATA_JSON,
-                    "cpu": perf_latest.get('cpu_pct') or ConnectorAPI.NODATA_JSON,
-                    "disk": perf_latest.get('disk_pct') or ConnectorAPI.NODATA_JSON,
-                    "mem": perf_latest.get('mem_pct') or ConnectorAPI.NODATA_JSON,
-                    "network": perf_latest.get('network_traffic_mbps') or ConnectorAPI.NODATA_JSON,
-                    "dialout_total": perf_latest.get('dialout_total') or ConnectorAPI.NODATA_JSON,
-                    "dialout_idle": perf_latest.get('dialout_idle') or ConnectorAPI.NODATA_JSON,
-                    "dialout_active": perf_latest.get('active_dialout_count') or ConnectorAPI.NODATA_JSON
-                })
-            # Help SIEM with the mapping connector <-> apps
-            if show_apps:
-                apps = []
-                for a in self.findappbyconnector(EAAItem("con://" + c.get('uuid_url'))):
-                    apps.append(str(a[2]))
-                data.update({"apps": apps})
-            if not json_fmt:
-                cli.print(format_line.format(
-                    scheme=EAAItem.Type.Connector.scheme,
-                    con_id=c.get('uuid_url'),
-                    name=c.get('name'),
-                    reachable=c.get('reach'),
-                    status=c.get('status'),
-                    version=((c.get('agent_version') or ConnectorAPI.NODATA)).replace('AGENT-', '').strip(),
-                    privateip=c.get('private_ip') or ConnectorAPI.NODATA,
-                    publicip=c.get('public_ip') or ConnectorAPI.NODATA,
-                    debugchan='Y' if c.get('debug_channel_permitted') else 'N',
-                    ts=perf_latest.get('timestamp') or ConnectorAPI.NODATA,
-                    cpu=perf_latest.get('cpu_pct') or ConnectorAPI.NODATA,
-                    disk=perf_latest.get('disk_pct') or ConnectorAPI.NODATA,
-                    mem=perf_latest.get('mem_pct') or ConnectorAPI.NODATA,
-                    network=perf_latest.get('network_traffic_mbps') or ConnectorAPI.NODATA,
-                    dialout_total=perf_latest.get('dialout_total') or ConnectorAPI.NODATA,
-                    dialout_idle=perf_latest.get('dialout_idle') or ConnectorAPI.NODATA,
-                    dialout_active=perf_latest.get('active_dialout_count') or ConnectorAPI.NODATA
-                ))
+                # Add performance metrics in the report, they come in the order of the connectors
+                perf_res = executor.map(self.perf_system, connector_ids)
             else:
-                cli.print(json.dumps(data))
+                perf_res = repeat((None, {}))
+            for c, con_id, (_, perf_latest) in zip(connectors, connector_ids, perf_res):
+                # Each attribute is looked up once, for both the JSON and the CSV output
+                name = c.get('name')
+                reachable = c.get('reach')
+                status = c.get('status')
+                agent_version = c.get('agent_version')
+                if agent_version:
+                    agent_version = agent_version.replace('AGENT-', '').strip()
+                private_ip = c.get('private_ip')
+                public_ip = c.get('public_ip')
+                debugchan = 'Y' if c.get('debug_channel_permitted') else 'N'
+                if perf:
+                    perf_values = {
+                        "ts": perf_latest.get('timestamp'),
+                        "cpu": perf_latest.get('cpu_pct'),
+                        "disk": perf_latest.get('disk_pct'),
+                        "mem": perf_latest.get('mem_pct'),
+                        "network": perf_latest.get('network_traffic_mbps'),
+                        "dialout_total": perf_latest.get('dialout_total'),
+                        "dialout_idle": perf_latest.get('dialout_idle'),
+                        "dialout_active": perf_latest.get('active_dialout_count')
+                    }
+
+                if json_fmt:
+                    data = {
+                        "connector_uuid": con_id,
+                        "name": name,
+                        "reachable": reachable,
+                        "status": status,
+                        "version": agent_version or ConnectorAPI.NODATA_JSON,
+                        "privateip": private_ip or ConnectorAPI.NODATA_JSON,
+                        "publicip": public_ip or ConnectorAPI.NODATA_JSON,
+                        "debugchan": debugchan,
+                        "os_version": c.get('os_version') or ConnectorAPI.NODATA_JSON,
+                        "datetime": dt
+                    }
+                    data.update((k, ConnectorAPI._nd(v, ConnectorAPI.NODATA_JSON)) for k, v in perf_values.items())
+                    # Help SIEM with the mapping connector <-> apps
+                    if show_apps:
+                        apps = []
+                        for a in self.findappbyconnector(EAAItem.from_uuid(EAAItem.Type.Connector, con_id)):
+                            apps.append(str(a[2]))
+                        data.update({"apps": apps})
+                    write_row(json.dumps(data))
+                else:
+                    line = (f"{scheme}{con_id},{name},{reachable},{status},{agent_version or ConnectorAPI.NODATA},"
+                            f"{private_ip or ConnectorAPI.NODATA},{public_ip or ConnectorAPI.NODATA},{debugchan}")
+                    if perf:
+                        line += "," + ",".join(str(ConnectorAPI._nd(perf_values[k])) for k in perf_columns)
+                    write_row(line)
+        if rows:
+            cli.print("\n".join(rows))
         if not json_fmt:
-            cli.footer("Total %s connector(s)" % total_con)
+            cli.footer("Total %s connector(s)" % len(connectors))
 
     def list(self, perf, json_fmt, show_apps=False, follow=False, interval=300, stop_event=None):
         """
@@ -250,14 +271,53 @@ class ConnectorAPI(BaseAPI):
         with a size of 1, combined with a functiom argument `exp` that will be
         used as expiration or cache key.
 
+        Only what findappbyconnector() returns is kept, indexed by connector,
+        the expanded application configurations are released right away.
+
         Args:
             exp (integer): cache key
         Returns:
-            [dict]: JSON dictionnary containing all the applications for this tenant
+            dict: list of (app moniker, name, host, dialout version) by connector UUID
+        """
+        apps_by_con = {}
+        for app in chain.from_iterable(self.app_pages()):
+            if not app.get('agents'):
+                continue
+            # Only tunnel apps are using Dialout Version 2
+            dialout_ver = 2 if app.get('app_profile') == ApplicationAPI.Profile.TCP.value else 1
+            app_moniker = EAAItem.from_uuid(EAAItem.Type.Application, app.get('uuid_url'))
+            app_host = app.get('host')
+            if app.get('domain') == 2:
+                app_host += "." + app.get('domain_suffix')
+            app_info = (app_moniker, app.get('name'), app_host, dialout_ver)
+            for con in app.get('agents', []):
+                apps_by_con.setdefault(con.get('uuid_url'), []).append(app_info)
+        return apps_by_con
+
+    def app_pages(self):
+        """
+        Fetch the applications of the tenant (expanded), one page at a time.
+        The first page tells how many applications there are, the other pages
+        are then fetched concurrently and yielded in order.
+
+        Yields:
+            list: application configurations of the page
         """
-        url_params = {'limit': ApplicationAPI.LIMIT_SOFT, 'expand': 'true'}
-        search_app = self.get('mgmt-pop/apps', params=url_params)
-        return search_app.json()
+        url_params = {'limit': ConnectorAPI.APP_PAGE_SIZE, 'offset': 0, 'expand': 'true'}
+
+        def fetch_page(offset):
+            page = self.get('mgmt-pop/apps', params=dict(url_params, offset=offset))
+            return self.parse_json(page)
+
+        first_page = fetch_page(0)
+        yield first_page.get('objects', [])
+        total_count = (first_page.get('meta') or {}).get('total_count') or 0
+        offsets = range(ConnectorAPI.APP_PAGE_SIZE, total_count, ConnectorAPI.APP_PAGE_SIZE)
+        if offsets:
+            workers = min(self._config.concurrency, len(offsets))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for page in executor.map(fetch_page, offsets):
+                    yield page.get('objects', [])
 
     def allow_list(self):
         """
@@ -285,7 +345,7 @@ class ConnectorAPI(BaseAPI):
             fieldnames = ['Service', 'Location', 'Protocol', ep_fmt, 'LastUpdate', 'Apps']
             csv_writer.writerow(fieldnames)
         r = self.get("zt/outboundallowlist")
-        for l in r.json():
+        for l in self.parse_json(r):
             d = datetime.datetime.fromisoformat(l.get('modifiedDate'))
             used_apps = appcount_by_cloudzone.get(l.get('location'))
             if later_than and d < later_than:
@@ -324,23 +384,10 @@ class ConnectorAPI(BaseAPI):
 
         now = time.time()
         exp = now - now % (-1 * ConnectorAPI.APP_CACHE_TTL)
-        apps = self.all_apps(exp)
+        apps_by_con = self.all_apps(exp)
 
-        logging.debug("Searching app using %s..." % connector_moniker)
-        for app in apps.get('objects', []):
-            # Only tunnel apps are using Dialout Version 2
-            dialout_ver = 2 if app.get('app_profile') == ApplicationAPI.Profile.TCP.value else 1
-            for con in app.get('agents', []):
-                app_moniker = EAAItem("app://" + app.get('uuid_url'))
-                con_moniker = EAAItem("con://" + con.get('uuid_url'))
-                app_host = app.get('host')
-                if app.get('domain') == 2:
-                    app_host += "." + app.get('domain_suffix')
-                if con_moniker == connector_moniker:
-                    yield app_moniker, \
-                          app.get('name'), \
-                          app_host, \
-                          dialout_ver
+        logging.debug("Searching app using %s...", connector_moniker)
+        yield from apps_by_con.get(connector_moniker.uuid, [])
 
     def list_apps(self, con_moniker, perf=False):
         """
@@ -449,7 +496,7 @@ class ConnectorAPI(BaseAPI):
             cli.print_error(f"Connector was not created due to the following error: {response.text}")
             cli.exit(2)
 
-        connector_info = response.json()
+        connector_info = self.parse_json(response)
         connector_moniker = EAAItem(f'con://{connector_info.get("uuid_url")}')
         start = time.time()
         wait_until = start + config.connector_dl_wait
@@ -457,14 +504,15 @@ class ConnectorAPI(BaseAPI):
         bakeoff_factor = 2 # Multiplier of wait time between each poll
         bakeoff_max = 60 # max interval we wait between each poll
         while time.time() < wait_until:
-            connector_info = self.load(connector_moniker)
+            # Polling, we want the latest state of the connector
+            connector_info = self.load(connector_moniker, cached=False)
             if connector_info.get('download_url'):
                 break
             logging.debug(f"Wait {wait_interval}s...")
             time.sleep(wait_interval)
             wait_interval = min(wait_interval * bakeoff_factor, bakeoff_max)
 
-        cli.print(json.dumps(connector_info, indent=2))
+        cli.print_json(connector_info, indent=2)
 
     def remove(self, connector_moniker: EAAItem):
         "Delete an EAA connector."
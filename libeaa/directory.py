@@ -88,11 +88,11 @@ class DirectoryAPI(BaseAPI):
 
     def list_groups(self):
         url_params = {'limit': 0}
-        url = 'mgmt-pop/directories/{directory_id}/groups'.format(directory_id=self._directory_id)
+        url = f'mgmt-pop/directories/{self._directory_id}/groups'
         if self._config.search_pattern:
             url_params = url_params.update({'q': self._config.search_pattern})
         resp = self.get(url, params=url_params)
-        resj = resp.json()
+        resj = self.parse_json(resp)
         cli.header("#GroupID,name,last_sync")
         for u in resj.get('objects'):
             print('{scheme}{uuid},{name},{last_sync_time}'.format(
@@ -103,13 +103,13 @@ class DirectoryAPI(BaseAPI):
             ))
 
     def list_users(self, search=None):
-        logging.info("SEARCH %s" % search)
+        logging.info("SEARCH %s", search)
         url_params = {'limit': 0}
         url = 'mgmt-pop/users'
         if search:
             url_params.update({'q': search})
         resp = self.get(url, params=url_params)
-        resj = resp.json()
+        resj = self.parse_json(resp)
         for u in resj.get('objects'):
             cli.print("{scheme}{uuid},{fn},{ln}".format(
                 scheme=EAAItem.Type.User.scheme,
@@ -162,7 +162,7 @@ class DirectoryAPI(BaseAPI):
             resp = self.get("mgmt-pop/directories")
             if resp.status_code != 200:
                 logging.error("Error retrieve directories (%s)" % resp.status_code)
-            resj = resp.json()
+            resj = self.parse_json(resp)
             if not self._config.batch and not self._config.json:
                 cli.header("#dir_id,dir_name,status,user_count,group_count")
             total_dir = 0
@@ -208,14 +208,11 @@ class DirectoryAPI(BaseAPI):
 
     def deloverlaygroup(self, group_id):
         raise NotImplementedError("Group Overlay deletion is not implemented")
-        url = "mgmt-pop/directories/{directory_id}/groups/{group_id}".format(
-                directory_id=self._directory_id,
-                group_id=group_id
-            )
+        url = f"mgmt-pop/directories/{self._directory_id}/groups/{group_id}"
         self.delete(url)
 
     def addoverlaygroup(self, groupname):
-        url = "mgmt-pop/directories/{directory_id}/groups".format(directory_id=self._directory_id)
+        url = f"mgmt-pop/directories/{self._directory_id}/groups"
         resp = self.post(url, json={"status": 1, "group_type": 4, "name": groupname})
         if resp.status_code != 200:
             logging.error("Error adding group to directory %s" % self._directory_id)
@@ -241,11 +238,11 @@ class DirectoryAPI(BaseAPI):
         :param dn: Distiguished Name of the group
                    Example: CN=Print Operators,CN=Builtin,DC=AKAMAIDEMO,DC=NET
         """
-        url = "mgmt-pop/directories/{directory_id}/groups".format(directory_id=self._directory_id)
+        url = f"mgmt-pop/directories/{self._directory_id}/groups"
         for scanned_dn in util.argument_tolist((dn,)):
             group = DirectoryAPI.groupname_from_dn(scanned_dn)
             if group:
-                logging.debug("Adding group %s" % (scanned_dn))
+                logging.debug("Adding group %s", scanned_dn)
                 resp = self.post(url, json={"name": group, "dn": scanned_dn})
                 if resp.status_code != requests.status_codes.codes.ok:
                     logging.error(resp.status_code)
@@ -271,13 +268,11 @@ class DirectoryAPI(BaseAPI):
         while retry_remaining > 0:
             retry_remaining -= 1
             cli.print("Synchronizing %s [retry=%s]..." % (group_uuid, retry_remaining))
-            resp = self.get('mgmt-pop/directories/{dir_uuid}/groups/{group_uuid}'.format(
-                dir_uuid=self._directory_id,
-                group_uuid=group.uuid))
+            resp = self.get(f'mgmt-pop/directories/{self._directory_id}/groups/{group.uuid}')
             if resp.status_code != 200:
                 logging.error("Error retrieve group info (%s)" % resp.status_code)
                 cli.exit(2)
-            group_info = resp.json()
+            group_info = self.parse_json(resp)
             if group_info.get('last_sync_time'):
                 last_sync = datetime.datetime.fromisoformat(group_info.get('last_sync_time'))
                 delta = datetime.datetime.utcnow() - last_sync
@@ -287,7 +282,7 @@ class DirectoryAPI(BaseAPI):
                     delta.total_seconds())
                 )
                 if delta.total_seconds() > self._config.mininterval:
-                    sync_resp = self.post('mgmt-pop/groups/{group_uuid}/sync'.format(group_uuid=group.uuid))
+                    sync_resp = self.post(f'mgmt-pop/groups/{group.uuid}/sync')
                     if sync_resp.status_code != 200:
                         cli.print_error("Fail to synchronize group (API response code %s)" % sync_resp.status_code)
                         cli.exit(3)
@@ -308,6 +303,6 @@ class DirectoryAPI(BaseAPI):
 
     def synchronize(self):
         print("Synchronize whole directory %s..." % self._directory_id)
-        response = self.post("mgmt-pop/directories/{dirId}/sync".format(dirId=self._directory_id))
+        response = self.post(f"mgmt-pop/directories/{self._directory_id}/sync")
         if response.status_code == 200 and not self._config.batch:
             print("Directory %s synchronization requested." % self._directory_id)
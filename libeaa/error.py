@@ -14,7 +14,7 @@
 
 import sys
 from enum import Enum
-from unittest.signals import installHandler
+
 
 class rc_error(Enum):
     """
@@ -22,6 +22,7 @@ import signal
 import os
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor
 
 # 3rd party modules
 import requests
@@ -197,9 +198,20 @@ class EventLogAPI(common.BaseAPI):
 
         return output_dict
 
-    def get_logs(self, drpc_args, logtype=EventType.USER_ACCESS, output=None):
+    def fetch_page(self, drpc_args, logtype=EventType.USER_ACCESS):
+        """
+        Send the log query for one page, return the raw HTTP response.
+        """
+        return self.post(self.get_api_url(logtype), json=drpc_args)
+
+    def get_logs(self, drpc_args, logtype=EventType.USER_ACCESS, output=None, page=None, prefetch=None):
         """
         Fetch the logs, by default the user access logs.
+
+        :param page:     Future of a response already requested with `fetch_page`, if None the
+                         query is sent synchronously
+        :param prefetch: Callable invoked with the scroll_id of the next page as soon as it is known,
+                         so the next request overlaps with the output of the current page
         """
         if not isinstance(logtype, self.EventType):
             raise ValueError("Unsupported log type %s" % logtype)
@@ -212,7 +224,10 @@ class EventLogAPI(common.BaseAPI):
             #             the remote server expect to deliver using a scrolling mechanism
             count = 0
             api_url = self.get_api_url(logtype)
-            resp = self.post(api_url, json=drpc_args)
+            if page is not None:
+                resp = page.result()
+            else:
+                resp = self.fetch_page(drpc_args, logtype)
             logger.debug(f"Response HTTP/{resp.status_code}, "
                          f"HTTP header for POST {self._baseurl}{api_url} {resp.headers}")
             if not resp.headers.get('content-type'):
@@ -229,8 +244,9 @@ class EventLogAPI(common.BaseAPI):
                 msg = "Invalid API response status code: %s" % resp.status_code
                 raise CLIFatalException(msg)
 
-            resj = resp.json()
-            logger.debug("JSON> %s" % json.dumps(resj, indent=2))
+            resj = self.parse_json(resp)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("JSON> %s", common.json_pretty(resj))
 
             if 'message' in resj:
                 if logtype == self.EventType.USER_ACCESS:
@@ -244,6 +260,8 @@ class EventLogAPI(common.BaseAPI):
                     raise NotImplementedError("Doesn't support log type %s" % logtype)
 
                 logger.debug("scroll_id: %s" % scroll_id)
+                if scroll_id is not None and prefetch:
+                    prefetch(scroll_id)
 
                 if logtype == self.EventType.USER_ACCESS:
                     for e in resj.get('message', [])[0][1].get('data', []):
@@ -355,24 +373,34 @@ class EventLogAPI(common.BaseAPI):
                 if log_type == log_type.ADMIN:
                     if not config.batch and out.seekable():
                         cli.print("#DatetimeUTC,AdminID,ResourceType,Resource,Event,EventType")
-                scroll_id = None
-                while not stop_event.is_set():
-                    drpc_args = {
-                        'sts': str(sts),
-                        'ets': str(ets),
-                        'metrics': 'logs',
-                        'es_fields': 'flog',
-                        'limit': config.limit,
-                        'sub_metrics': 'scroll',
-                        'source': SOURCE
-                    }
-                    if scroll_id is not None:
-                        drpc_args.update({'scroll_id': str(scroll_id)})
-                    scroll_id, count = self.get_logs(drpc_args, log_type, out)
-                    fetch_log_count += count
-                    out.flush()
-                    if scroll_id is None:
-                        break
+                # The API paginates with a server side scroll, pages can only be requested
+                # one after the other. We send the next request as soon as its scroll_id
+                # is known, while the current page is being written out.
+                with ThreadPoolExecutor(max_workers=1) as prefetcher:
+
+                    def request_page(scroll_id=None):
+                        drpc_args = {
+                            'sts': str(sts),
+                            'ets': str(ets),
+                            'metrics': 'logs',
+                            'es_fields': 'flog',
+                            'limit': config.limit,
+                            'sub_metrics': 'scroll',
+                            'source': SOURCE
+                        }
+                        if scroll_id is not None:
+                            drpc_args.update({'scroll_id': str(scroll_id)})
+                        pending_pages.append((drpc_args, prefetcher.submit(self.fetch_page, drpc_args, log_type)))
+
+                    pending_pages = []
+                    request_page()
+                    while pending_pages and not stop_event.is_set():
+                        drpc_args, page = pending_pages.pop(0)
+                        scroll_id, count = self.get_logs(drpc_args, log_type, out, page, prefetch=request_page)
+                        fetch_log_count += count
+                        out.flush()
+                        if scroll_id is None:
+                            break
                 if (not config.tail) or (config.start and config.end):
                     if not config.batch and out.seekable():
                         total_bytes = out.tell() - start_position
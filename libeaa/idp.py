@@ -19,6 +19,8 @@ from common import cli, BaseAPI
 from application import ApplicationAPI
 
 MAX_RESULT = 1000
+#: Status name by value, looked up for every IdP listed
+_STATUS_NAME = {s.value: s.name for s in ApplicationAPI.Status}
 logger = logging.getLogger(__name__)
 
 class IdentityProviderAPI(BaseAPI):
@@ -29,34 +31,40 @@ class IdentityProviderAPI(BaseAPI):
         super(IdentityProviderAPI, self).__init__(config, api=BaseAPI.API_Version.OpenAPI)
 
     def load(self, idp_moniker):
-        api_idp = self.get('mgmt-pop/idp/{idp}'.format(idp=idp_moniker.uuid))
+        api_idp = self.get(f'mgmt-pop/idp/{idp_moniker.uuid}')
         if api_idp.status_code != 200:
             raise Exception("Error loading IdP %s configuration" % idp_moniker)
-        return api_idp.json()
+        return self.parse_json(api_idp)
 
     def list(self):
         url_params = {'limit': MAX_RESULT}
         search_idp = self.get('mgmt-pop/idp', params=url_params)
+        if search_idp.status_code != 200:
+            cli.print_error(f"API Error HTTP/{search_idp.status_code} for {search_idp.url}")
+            cli.exit(2)
         cli.header("#IdP-id,name,idp_hostname,status,certificate,client,dp")
-        idps = search_idp.json()
+        idps = self.parse_json(search_idp).get('objects', [])
         logger.debug(idps)
-        for i in idps.get('objects', []):
-            cli.print("idp://{idp_id},{name},{host},{status},{cert},{client},{dp}".format(
+        rows = []  # Written at once, not one write per IdP
+        for i in idps:
+            rows.append("idp://{idp_id},{name},{host},{status},{cert},{client},{dp}".format(
                 idp_id=i.get('uuid_url'),
                 name=i.get('name'),
                 host=i.get('login_host'),
-                status=ApplicationAPI.Status(i.get('idp_status')).name,
+                status=_STATUS_NAME.get(i.get('idp_status'), '-'),
                 cert=(("crt://%s" % i.get('cert')) if i.get('cert') else '-'),
                 client=('Y' if i.get('enable_access_client') else 'N'),
                 dp=('Y' if i.get('enable_device_posture') else 'N')
             ))
+        if rows:
+            cli.print("\n".join(rows))
 
     def deploy(self, idp_moniker):
         """
         POST https://control.akamai.com/crux/v1/mgmt-pop/idp/{idp_id}/deploy
         Payload: {}
         """
-        deploy_idp = self.post('mgmt-pop/idp/{idp_id}/deploy'.format(idp_id=idp_moniker.uuid), json={})
+        deploy_idp = self.post(f'mgmt-pop/idp/{idp_moniker.uuid}/deploy', json={})
         if deploy_idp.status_code != 200:
             raise Exception("Error deploying IdP %s HTTP %s" %
                             (idp_moniker, deploy_idp.status_code))
@@ -69,7 +77,7 @@ class IdentityProviderAPI(BaseAPI):
         idp_by_pop_uuid = {}
         url_params = {'limit': MAX_RESULT}
         search_idp = self.get('mgmt-pop/idp', params=url_params)
-        idps = search_idp.json()
+        idps = self.parse_json(search_idp)
 
         for idp in idps.get('objects'):
             pop_uuid = idp.get('pop')
@@ -44,7 +44,7 @@ class ReportingAPI(BaseAPI):
         resp = self.get('mgmt-pop/clients', params=params)
         if resp.status_code != 200:
             logger.error(resp.text)
-        data = resp.json()
+        data = self.parse_json(resp)
         cli.header("#device_id,version,idp_user,idp_host,lastseen")
         for count, c in enumerate(data.get('objects', {})):
             cli.print("{device_id},{version},{idp_user},{idp_host},{lastseen}".format(
@@ -83,7 +83,7 @@ class ReportingAPI(BaseAPI):
             idp_by_pop = idp_api.stats_by_pop()
 
         scanned_cz = []
-        for eaa_cloudzone in resp.json().get('objects'):
+        for eaa_cloudzone in self.parse_json(resp).get('objects'):
             cz_info = {
                 "name": eaa_cloudzone.get('region'),
                 "facility": ReportingAPI.facility_from_popname(eaa_cloudzone.get('name')),
@@ -98,7 +98,7 @@ class ReportingAPI(BaseAPI):
         # sort by Cloud Zone name
         info['cloudzones'] = sorted(scanned_cz, key=lambda x: x['name'])
 
-        cli.print(json.dumps(info, indent=4))
+        cli.print_json(info, indent=4)
 
     def deviceposture_inventory(self, follow=False, interval=300):
         """
@@ -120,7 +120,7 @@ class ReportingAPI(BaseAPI):
                 if resp.status_code != 200:
                     cli.print_error("Non HTTP 200 response fromt the API")
                     cli.exit(2)
-                doc = resp.json()
+                doc = self.parse_json(resp)
                 meta = doc.get('meta', {})
                 next_page = meta.get('next')
                 limit = meta.get('limit')
@@ -149,29 +149,8 @@ class ReportingAPI(BaseAPI):
                                  "consider increase the --interval parameter")
 
     def deviceposture_devicehistory(self, device_id):
-        resp = self.get('device-posture/inventory/device-history/{deviceId}'.format(deviceId=device_id))
-        cli.print(json.dumps(resp.json(), indent=4))
-
-    def last_access(self, start: int, end: int, app: str = None):
-        """
-        Report with unique user ID and last access to the given application
-        Application can be a business application on an IdP
-        """
-        params = {
-            "start": start * 1000,
-            "end": end * 1000,
-            "tz": "UTC",
-            "limit": 50,
-        }
-        params["start"] = 1717052400000
-        params["end"] = 1717202781000
-        # params["_remove-extras_"] = 1
-        if app:
-            params["app"] = app
-        # params
-        resp = self.get('application-reports/ops/query', params=params)
-        cli.print(json.dumps(resp.json(), indent=4))
-
+        resp = self.get(f'device-posture/inventory/device-history/{device_id}')
+        cli.print_json(self.parse_json(resp), indent=4)
 
     @staticmethod
     def split_time_range(start, end, num_sub_ranges):
@@ -213,7 +192,7 @@ class ReportingAPI(BaseAPI):
             cli.print_error("Unexpected response {resp.url}: HTTP/{resp.status_code}")
             cli.exit(2)
 
-        data = resp.json().get('data', [])
+        data = self.parse_json(resp).get('data', [])
         logger.debug(f"_last_access() | {len(data)} records | API time {resp.elapsed.total_seconds():.2f} sec")
         return data
 
@@ -58,9 +58,15 @@ import os
 import json
 import re
 import signal
+import sys
+import tempfile
+from unittest import mock
 
 # CLI EAA
 from libeaa.error import rc_error
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "bin"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "libeaa"))
+import config as cli_config  # noqa: E402
 
 # 3rd party modules
 import requests
@@ -259,6 +265,99 @@ class TestApplication(CliEAATest):
         self.assertGreater(app_count, 0, "We expect at least one application to be configured")
         self.assertEqual(cmd.returncode, 0, 'return code must be 0')
 
+    def tunnel_app(self):
+        """
+        Tunnel-type client-app used for the DNS exception tests, e.g. app://abcdefgh
+        """
+        app_id = os.getenv('TEST_TUNNEL_APP')
+        if not app_id:
+            self.skipTest("set TEST_TUNNEL_APP env for this test")
+        return app_id
+
+    def dns_exceptions(self, app_id):
+        cmd = self.cli_run('app', app_id)
+        stdout, stderr = cmd.communicate()
+        self.assertEqual(cmd.returncode, 0, 'return code must be 0')
+        app_config = json.loads(stdout.decode(encoding))
+        exceptions = (app_config.get('advanced_settings') or {}).get('domain_exception_list') or ''
+        return [fqdn for fqdn in exceptions.split(',') if fqdn]
+
+    def test_dnsexception_add_remove(self):
+        """
+        Add a DNS exception, add it again (nothing to update), then remove it
+        Command line: akamai eaa app app://abcdefgh add_dnsexception fqdn
+        """
+        app_id = self.tunnel_app()
+        fqdn = f'cli-eaa-test-{int(time.time())}.example.com'
+        before = self.dns_exceptions(app_id)
+
+        cmd = self.cli_run('app', app_id, 'add_dnsexception', fqdn)
+        cmd.communicate()
+        self.assertEqual(cmd.returncode, 0, 'return code must be 0')
+        self.assertEqual(self.dns_exceptions(app_id), before + [fqdn])
+
+        # Already in the list, the application must not be updated
+        cmd = self.cli_run('-v', 'app', app_id, 'add_dnsexception', fqdn)
+        stdout, stderr = cmd.communicate()
+        self.assertEqual(cmd.returncode, 0, 'return code must be 0')
+        self.assertIn('unchanged, nothing to update', stderr.decode(encoding))
+        self.assertNotIn(' PUT response', stderr.decode(encoding))
+        self.assertEqual(self.dns_exceptions(app_id), before + [fqdn])
+
+        cmd = self.cli_run('app', app_id, 'del_dnsexception', fqdn)
+        cmd.communicate()
+        self.assertEqual(cmd.returncode, 0, 'return code must be 0')
+        self.assertEqual(self.dns_exceptions(app_id), before)
+
+
+    def application_api(self):
+        """
+        ApplicationAPI instance on the configured tenant, outside of the command line
+        """
+        argv = ['akamai-eaa', '--edgerc', CliEAATest.config_edgerc(),
+                '--section', CliEAATest.config_section(), 'app', '-']
+        with mock.patch.object(sys, 'argv', argv):
+            from application import ApplicationAPI
+            from common import config, EAAItem
+        return ApplicationAPI(config), EAAItem('app://cli-eaa-test')
+
+    def test_dnsexception_conflict_already_applied(self):
+        """
+        HTTP 412 on the PUT while the application already has the new list,
+        e.g. the update went through but its response was lost: nothing to report
+        """
+        api, app = self.application_api()
+        before = {'advanced_settings': {'domain_exception_list': 'a.example.com'}}
+        after = {'advanced_settings': {'domain_exception_list': 'a.example.com,b.example.com'}}
+        with mock.patch.object(api, 'load', side_effect=[before, after]) as load, \
+                mock.patch.object(api, 'put', return_value=mock.Mock(status_code=412)) as put:
+            api.update_dnsexceptions(app, add=['b.example.com'])
+        self.assertEqual(put.call_count, 1)
+        self.assertEqual(load.call_count, 2)
+
+    def test_dnsexception_conflict(self):
+        """
+        HTTP 412 on the PUT, the application was changed by someone else
+        """
+        api, app = self.application_api()
+        before = {'advanced_settings': {'domain_exception_list': 'a.example.com'}}
+        after = {'advanced_settings': {'domain_exception_list': 'a.example.com,c.example.com'}}
+        with mock.patch.object(api, 'load', side_effect=[before, after]), \
+                mock.patch.object(api, 'put', return_value=mock.Mock(status_code=412)), \
+                self.assertRaises(SystemExit) as exit_:
+            api.update_dnsexceptions(app, add=['b.example.com'])
+        self.assertEqual(exit_.exception.code, 2)
+
+    def test_dnsexception_unchanged_normalized(self):
+        """
+        Adding an FQDN already listed, with spaces and duplicates in the stored list, sends no PUT
+        """
+        api, app = self.application_api()
+        stored = {'advanced_settings': {'domain_exception_list': 'a.example.com, b.example.com,a.example.com'}}
+        with mock.patch.object(api, 'load', return_value=stored), mock.patch.object(api, 'put') as put:
+            api.update_dnsexceptions(app, add=['b.example.com'])
+        put.assert_not_called()
+
 
 class TestConnectors(CliEAATest):
 
@@ -418,6 +517,76 @@ class TestCliEAA(CliEAATest):
         self.assertEqual(cmd.returncode, rc_error.EDGERC_SECTION_NOT_FOUND.value, f'return code must be {rc_error.EDGERC_MISSING.value}')
 
 
+    def edgerc_file(self, content):
+        """
+        Write a temporary .edgerc, removed at the end of the test.
+        """
+        edgerc = tempfile.NamedTemporaryFile('w', suffix='.edgerc', delete=False)
+        self.addCleanup(os.remove, edgerc.name)
+        with edgerc:
+            edgerc.write(content)
+        return edgerc.name
+
+    def load_edgerc(self, content):
+        edgerc = self.edgerc_file(content)
+        edgerc_stat = os.stat(edgerc)
+        return cli_config._load_edgerc(edgerc, edgerc_stat.st_mtime_ns, edgerc_stat.st_size)
+
+    def test_edgerc_default_section(self):
+        """
+        DEFAULT section values apply to every section, unless the section sets them.
+        """
+        sections = self.load_edgerc("[DEFAULT]\nhost = default.example\nmax_body = 1\n"
+                                    "[tenant]\nhost = tenant.example\n")
+        self.assertNotIn('DEFAULT', sections)
+        self.assertEqual(sections['tenant'], {'host': 'tenant.example', 'max_body': '1'})
+
+    def test_edgerc_key_lowercase(self):
+        """
+        Keys are lowercased like ConfigParser does, values are kept as is.
+        """
+        sections = self.load_edgerc("[tenant]\nClient_Token = AbC\n")
+        self.assertEqual(sections['tenant'], {'client_token': 'AbC'})
+
+    def test_edgerc_colon_separator(self):
+        """
+        Both '=' and ':' separate keys and values, the first one found wins.
+        """
+        sections = self.load_edgerc("[tenant]\nhost: tenant.example\nclient_secret = a:b=c\n")
+        self.assertEqual(sections['tenant'], {'host': 'tenant.example', 'client_secret': 'a:b=c'})
+
+    def test_edgerc_interpolation(self):
+        """
+        Values are interpolated like ConfigParser: '%%' and '%(key)s'.
+        """
+        options = {'host': 'tenant.example', 'client_secret': 'x%%y', 'url': 'https://%(host)s/'}
+        self.assertEqual(cli_config._interpolate(options['client_secret'], options), 'x%y')
+        self.assertEqual(cli_config._interpolate(options['url'], options), 'https://tenant.example/')
+        for invalid in ('x%y', '%(missing)s', '100%'):
+            with self.assertRaises(ValueError):
+                cli_config._interpolate(invalid, options)
+
+    def test_edgerc_invalid_interpolation(self):
+        """
+        A value ConfigParser can't read is reported before any API call.
+        """
+        edgerc = self.edgerc_file("[tenant]\nhost = tenant.example\nclient_secret = x%y\n")
+        cmd = self.cli_run('--edgerc', edgerc, '--section', 'tenant', 'info')
+        stdout, stderr = cmd.communicate()
+        self.assertEqual(cmd.returncode, rc_error.GENERAL_ERROR.value,
+                         f'return code must be {rc_error.GENERAL_ERROR.value}')
+        self.assertIn('client_secret', stderr.decode(encoding))
+
+    def test_edgerc_missing_section(self):
+        """
+        Section not found in a local .edgerc, no API call involved.
+        """
+        edgerc = self.edgerc_file("[DEFAULT]\nhost = default.example\n[tenant]\nhost = tenant.example\n")
+        cmd = self.cli_run('--edgerc', edgerc, '--section', 'section_does_not_exist', 'info')
+        stdout, stderr = cmd.communicate()
+        self.assertEqual(cmd.returncode, rc_error.EDGERC_SECTION_NOT_FOUND.value,
+                         f'return code must be {rc_error.EDGERC_SECTION_NOT_FOUND.value}')
+
     def test_cli_version(self):
         """
         Ensure version of the CLI is displayed
@@ -427,6 +596,40 @@ class TestCliEAA(CliEAATest):
         self.assertRegex(stdout.decode(encoding), r'[0-9]+\.[0-9]+\.[0-9]+\n', 'Version should be x.y.z')
         self.assertEqual(cmd.returncode, 0, 'return code must be 0')
 
+    def test_cli_version_no_edgerc(self):
+        """
+        Version is displayed even without a credentials file
+        """
+        cmd = self.cli_run('-e', 'file_not_exist', 'version')
+        stdout, stderr = cmd.communicate()
+        self.assertRegex(stdout.decode(encoding), r'[0-9]+\.[0-9]+\.[0-9]+\n', 'Version should be x.y.z')
+        self.assertEqual(cmd.returncode, 0, 'return code must be 0')
+
+    def test_scan_command(self):
+        """
+        The subcommand found ahead of parsing is the one the full parser finds.
+        """
+        edgerc = CliEAATest.config_edgerc()
+        for global_options in (['-c', 'sec'], ['--section=x'], ['--sec', 'x'], ['-vvv'], ['-e' + edgerc]):
+            argv = global_options + ['version']
+            with self.subTest(argv=argv):
+                full_args, _ = cli_config._build_parser().parse_known_args(argv)
+                self.assertEqual(cli_config._scan_command(argv), full_args.command)
+                self.assertEqual(full_args.command, 'version')
+
+    def test_cli_version_global_options(self):
+        """
+        Version is displayed whatever the form of the global options preceding it
+        """
+        expected = self.cli_run('version').communicate()[0]
+        edgerc = CliEAATest.config_edgerc()
+        for global_options in (['-c', 'sec'], ['--section=x'], ['--sec', 'x'], ['-vvv'], ['-e' + edgerc]):
+            with self.subTest(global_options=global_options):
+                cmd = self.cli_run(*global_options, 'version')
+                stdout, stderr = cmd.communicate()
+                self.assertEqual(cmd.returncode, 0, 'return code must be 0')
+                self.assertEqual(stdout, expected)
+
     def test_cli_info(self):
         """
         Display tenant info